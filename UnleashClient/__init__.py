@@ -1,11 +1,28 @@
 # pylint: disable=invalid-name
+import atexit
+import os
 import random
+import signal
 import string
+import threading
 import uuid
 import warnings
-from dataclasses import asdict
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, Optional
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
 
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.job import Job
@@ -24,31 +41,39 @@ from UnleashClient.constants import (
     SDK_NAME,
     SDK_VERSION,
 )
+from UnleashClient.context import (
+    CoarseClock,
+    UnleashContext,
+    copy_context,
+    merge_context,
+    normalize_context,
+    utc_now_isoformat,
+)
 from UnleashClient.events import (
     BaseEvent,
     UnleashEvent,
     UnleashEventType,
     UnleashReadyEvent,
 )
+from UnleashClient.flag import FeatureFlag, PinnedFlag
 from UnleashClient.loader import load_features
+from UnleashClient.metrics import MetricsCounter, MetricsSampler
+from UnleashClient.options import ClientOptions
+from UnleashClient.payloads import PayloadCache
 from UnleashClient.periodic_tasks import (
     aggregate_and_send_metrics,
     fetch_and_load_features,
 )
+from UnleashClient.result_cache import ResultCache, context_fingerprint
+from UnleashClient.scope import EvaluationScope
+from UnleashClient.sharded_engine import ShardedEngine
+from UnleashClient.state import FeatureState
+from UnleashClient.unknown_flags import UnknownFlagCounter
 
 from .cache import BaseCache, FileCache
 from .utils import LOGGER, InstanceAllowType, InstanceCounter
 
 INSTANCES = InstanceCounter()
-_BASE_CONTEXT_FIELDS = [
-    "userId",
-    "sessionId",
-    "environment",
-    "appName",
-    "currentTime",
-    "remoteAddress",
-    "properties",
-]
 
 
 def build_ready_callback(
@@ -62,6 +87,7 @@ def build_ready_callback(
         return None
 
     already_fired = False
+    fired_lock = threading.Lock()
 
     def ready_callback() -> None:
         """
@@ -69,14 +95,17 @@ def build_ready_callback(
         This will only call the event_callback once.
         """
         nonlocal already_fired
-        if already_fired:
-            return
+        # Checked & set under a lock, as features can be loaded from several threads at once.
+        with fired_lock:
+            if already_fired:
+                return
+            already_fired = True
+
         if event_callback:
             event = UnleashReadyEvent(
                 event_type=UnleashEventType.READY,
                 event_id=uuid.uuid4(),
             )
-            already_fired = True
             event_callback(event)
 
     return ready_callback
@@ -109,6 +138,7 @@ class UnleashClient:
     :param scheduler_executor: Name of APSCheduler executor to use if using a custom scheduler.
     :param multiple_instance_mode: Determines how multiple instances being instantiated is handled by the SDK, when set to InstanceAllowType.BLOCK, the client constructor will fail when more than one instance is detected, when set to InstanceAllowType.WARN, multiple instances will be allowed but log a warning, when set to InstanceAllowType.SILENTLY_ALLOW, no warning or failure will be raised when instantiating multiple instances of the client. Defaults to InstanceAllowType.WARN
     :param event_callback: Function to call if impression events are enabled.  WARNING: Depending on your event library, this may have performance implications!
+    :param options: Optional tuning (e.g. result caching), see UnleashClient.options.ClientOptions.
     """
 
     def __init__(
@@ -136,6 +166,7 @@ class UnleashClient:
         scheduler_executor: Optional[str] = None,
         multiple_instance_mode: InstanceAllowType = InstanceAllowType.WARN,
         event_callback: Optional[Callable[[BaseEvent], None]] = None,
+        options: Optional[ClientOptions] = None,
     ) -> None:
         custom_headers = custom_headers or {}
         custom_options = custom_options or {}
@@ -175,7 +206,7 @@ class UnleashClient:
         # Class objects
         self.fl_job: Job = None
         self.metric_job: Job = None
-        self.engine = UnleashEngine()
+        self._apply_options(options or ClientOptions())
 
         self.cache = cache or FileCache(
             self.unleash_app_name, directory=cache_directory
@@ -221,8 +252,71 @@ class UnleashClient:
             load_features(
                 cache=self.cache,
                 engine=self.engine,
+                state_callback=self._on_state_loaded,
             )
 
+    def _apply_options(self, options: ClientOptions) -> None:
+        self.options = options
+        self._init_engine_and_metrics(options)
+        self._init_evaluation(options)
+
+    def _init_engine_and_metrics(self, options: ClientOptions) -> None:
+        self.engine = (
+            ShardedEngine(options.engine_shards)
+            if options.engine_shards > 1
+            else UnleashEngine()
+        )
+        self.metrics_counter = MetricsCounter() if options.buffer_metrics else None
+        self.metrics_spool = options.metrics_spool
+        self.metrics_aggregator = options.metrics_aggregator
+        self.metrics_sampler = (
+            MetricsSampler(
+                self.metrics_counter or self.engine,
+                options.metrics_sample_rate,
+                options.metrics_sample_rates,
+            )
+            if options.metrics_sample_rate < 1 or options.metrics_sample_rates
+            else None
+        )
+        self._metrics: Union[MetricsCounter, MetricsSampler, UnleashEngine] = (
+            self.metrics_sampler or self.metrics_counter or self.engine
+        )
+        self.unleash_metrics_compression_threshold = (
+            options.metrics_compression_threshold if options.compress_metrics else None
+        )
+
+    def _init_evaluation(self, options: ClientOptions) -> None:
+        self.result_cache = (
+            ResultCache(options.result_cache_size, options.result_cache_ttl)
+            if options.result_cache_size
+            else None
+        )
+        self.payload_cache = PayloadCache()
+        self.unknown_flags = UnknownFlagCounter(options.unknown_flag_log_interval)
+        self._pinned_flags: List[PinnedFlag] = []
+        self._state_lock = threading.Lock()
+        self._destroyed = False
+        self._exit_hook: Optional[Callable[[], None]] = None
+        self._loaded_state: Optional[str] = None
+        self._state_generation = 0
+        self._feature_state = FeatureState()
+        self._clock: Callable[[], str] = (
+            CoarseClock(options.current_time_resolution_ms)
+            if options.current_time_resolution_ms
+            else utc_now_isoformat
+        )
+        self._current_time: Optional[Callable[[], str]] = None
+        self.unleash_prune_context = options.prune_context
+        self.unleash_compile_features = (
+            options.compile_features or options.verify_compiled_features
+        )
+        self.unleash_verify_compiled_features = options.verify_compiled_features
+        self.compiled_mismatches = 0
+        self._context_fields: Optional[FrozenSet[str]] = None
+        self._ambient_context: ContextVar[Optional[dict]] = ContextVar(
+            "unleash_ambient_context", default=None
+        )
+
     @property
     def unleash_refresh_interval_str_millis(self) -> str:
         return str(self.unleash_refresh_interval * 1000)
@@ -235,6 +329,20 @@ class UnleashClient:
     def connection_id(self):
         return self._connection_id
 
+    @property
+    def state_generation(self) -> int:
+        """
+        Incremented every time a changed set of feature toggles is loaded into the engine.
+        """
+        return self._state_generation
+
+    @property
+    def impression_data_features(self) -> FrozenSet[str]:
+        """
+        Names of the loaded feature toggles that emit impression events.
+        """
+        return self._feature_state.impression_data_features
+
     def initialize_client(self, fetch_toggles: bool = True) -> None:
         """
         Initializes client and starts communication with central unleash server(s).
@@ -287,6 +395,11 @@ class UnleashClient:
                     "custom_options": self.unleash_custom_options,
                     "request_timeout": self.unleash_request_timeout,
                     "engine": self.engine,
+                    "metrics_counter": self.metrics_counter,
+                    "compression_threshold": self.unleash_metrics_compression_threshold,
+                    "metrics_spool": self.metrics_spool,
+                    "metrics_aggregator": self.metrics_aggregator,
+                    "metrics_sampler": self.metrics_sampler,
                 }
 
                 # Register app
@@ -322,6 +435,7 @@ class UnleashClient:
                         "project": self.unleash_project_name,
                         "event_callback": self.unleash_event_callback,
                         "ready_callback": self._ready_callback,
+                        "state_callback": self._on_state_loaded,
                     }
                     job_func: Callable = fetch_and_load_features
                 else:
@@ -329,6 +443,7 @@ class UnleashClient:
                         "cache": self.cache,
                         "engine": self.engine,
                         "ready_callback": self._ready_callback,
+                        "state_callback": self._on_state_loaded,
                     }
                     job_func = load_features
 
@@ -390,37 +505,118 @@ class UnleashClient:
             for toggle in toggles
         }
 
-    def destroy(self) -> None:
+    def destroy(self, timeout: Optional[float] = None) -> None:
         """
         Gracefully shuts down the Unleash client by stopping jobs, stopping the scheduler, and deleting the cache.
 
         You shouldn't need this too much!
+
+        :param timeout: Maximum number of seconds to spend flushing metrics, optional.  The flush runs on a background thread and is abandoned once the timeout is up.  At interpreter shutdown, where threads can't be started, it runs in the calling thread with the request timeout capped at ``timeout`` instead.  If unset, waits for the flush to finish (up to ``request_timeout``).
         """
+        self._destroyed = True
+        if self._exit_hook is not None:
+            atexit.unregister(self._exit_hook)
+
         self.fl_job.remove()
         if self.metric_job:
             self.metric_job.remove()
 
             # Flush metrics before shutting down.
-            aggregate_and_send_metrics(
-                url=self.unleash_url,
-                app_name=self.unleash_app_name,
-                connection_id=self.connection_id,
-                instance_id=self.unleash_instance_id,
-                headers=self.metrics_headers,
-                custom_options=self.unleash_custom_options,
-                request_timeout=self.unleash_request_timeout,
-                engine=self.engine,
-            )
+            if timeout is None:
+                self._flush_metrics(self.unleash_request_timeout)
+            else:
+                request_timeout = min(self.unleash_request_timeout, timeout)
+                flush_thread = threading.Thread(
+                    target=self._flush_metrics,
+                    args=(request_timeout,),
+                    name="unleash-metrics-flush",
+                    daemon=True,
+                )
+                try:
+                    flush_thread.start()
+                except RuntimeError:
+                    # Threads can't be started at interpreter shutdown (e.g. from atexit hooks).
+                    self._flush_metrics(request_timeout)
+                else:
+                    flush_thread.join(timeout)
+                    if flush_thread.is_alive():
+                        LOGGER.warning(
+                            "Abandoned flushing metrics after %s seconds.", timeout
+                        )
 
-        self.unleash_scheduler.shutdown()
+        self.unleash_scheduler.shutdown(wait=timeout is None)
         self.cache.destroy()
 
+    def destroy_on_exit(
+        self, timeout: Optional[float] = 5.0, signals: Iterable[int] = ()
+    ) -> None:
+        """
+        Destroys the client (flushing metrics) when the interpreter exits, or when one of the given signals is received, unless it was already destroyed.
+
+        Signal handlers that were already installed are called after the client is destroyed.  For signals without a handler, or whose handler wasn't installed from Python, the default action (e.g. terminating the process) is taken.  Signal handlers can only be installed from the main thread.
+
+        The hooks don't keep the client alive: if it's garbage collected, they do nothing.
+
+        .. code-block:: python
+
+            client.initialize_client()
+            client.destroy_on_exit(timeout=2, signals=[signal.SIGTERM])
+
+        :param timeout: Maximum number of seconds to spend flushing metrics, see ``destroy()``.
+        :param signals: Signals (e.g. ``signal.SIGTERM``) that also destroy the client.
+        """
+
+        client_ref = weakref.ref(self)
+
+        def exit_hook() -> None:
+            client = client_ref()
+            if client is not None and client.is_initialized and not client._destroyed:
+                client.destroy(timeout)
+
+        for signum in signals:
+            previous_handler = signal.getsignal(signum)
+
+            def signal_handler(signum, frame, previous_handler=previous_handler):
+                exit_hook()
+                if callable(previous_handler):
+                    previous_handler(signum, frame)
+                elif previous_handler is None or previous_handler == signal.SIG_DFL:
+                    signal.signal(signum, signal.SIG_DFL)
+                    os.kill(os.getpid(), signum)
+
+            signal.signal(signum, signal_handler)
+
+        if self._exit_hook is not None:
+            atexit.unregister(self._exit_hook)
+        atexit.register(exit_hook)
+        self._exit_hook = exit_hook
+
+    def _flush_metrics(self, request_timeout: float) -> None:
+        aggregate_and_send_metrics(
+            url=self.unleash_url,
+            app_name=self.unleash_app_name,
+            connection_id=self.connection_id,
+            instance_id=self.unleash_instance_id,
+            headers=self.metrics_headers,
+            custom_options=self.unleash_custom_options,
+            request_timeout=request_timeout,
+            engine=self.engine,
+            metrics_counter=self.metrics_counter,
+            compression_threshold=self.unleash_metrics_compression_threshold,
+            metrics_spool=self.metrics_spool,
+            metrics_aggregator=self.metrics_aggregator,
+            metrics_sampler=self.metrics_sampler,
+        )
+        if self.metrics_aggregator is not None:
+            self.metrics_aggregator.close()
+
     @staticmethod
     def _get_fallback_value(
         fallback_function: Callable, feature_name: str, context: dict
     ) -> bool:
         if fallback_function:
-            fallback_value = fallback_function(feature_name, context)
+            # Contexts may be shared (e.g. by an UnleashContext), so fallback functions get a copy.
+            fallback_value = fallback_function(feature_name, copy_context(context))
         else:
             fallback_value = False
 
@@ -430,7 +626,7 @@ class UnleashClient:
     def is_enabled(
         self,
         feature_name: str,
-        context: Optional[dict] = None,
+        context: Optional[Union[dict, UnleashContext]] = None,
         fallback_function: Callable = None,
     ) -> bool:
         """
@@ -441,44 +637,35 @@ class UnleashClient:
         * If client hasn't been initialized yet or an error occurs, flag will default to false.
 
         :param feature_name: Name of the feature
-        :param context: Dictionary with context (e.g. IPs, email) for feature toggle.
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
         :param fallback_function: Allows users to provide a custom function to set default value.
         :return: Feature flag result
         """
-        context = self._safe_context(context)
-        feature_enabled = self.engine.is_enabled(feature_name, context)
-
+        feature_enabled = self._feature_state.constant_features.get(feature_name)
         if feature_enabled is None:
-            feature_enabled = self._get_fallback_value(
-                fallback_function, feature_name, context
-            )
-
-        self.engine.count_toggle(feature_name, feature_enabled)
-        try:
-            if (
-                self.unleash_event_callback
-                and self.engine.should_emit_impression_event(feature_name)
-            ):
-                event = UnleashEvent(
-                    event_type=UnleashEventType.FEATURE_FLAG,
-                    event_id=uuid.uuid4(),
-                    context=context,
-                    enabled=feature_enabled,
-                    feature_name=feature_name,
-                )
-
-                self.unleash_event_callback(event)
-        except Exception as excep:
-            LOGGER.log(
-                self.unleash_verbose_log_level,
-                "Error in event callback: %s",
-                excep,
+            context = self._safe_context(context)
+            return self._evaluate_is_enabled(feature_name, context, fallback_function)
+
+        # The result doesn't depend on the context, so it's only normalized if an impression event needs it.
+        self._metrics.count_toggle(feature_name, feature_enabled)
+        if (
+            self.unleash_event_callback
+            and feature_name in self._feature_state.impression_data_features
+        ):
+            self._emit_impression_event(
+                UnleashEventType.FEATURE_FLAG,
+                feature_name,
+                self._safe_context(context),
+                feature_enabled,
             )
 
         return feature_enabled
 
-    # pylint: disable=broad-except
-    def get_variant(self, feature_name: str, context: Optional[dict] = None) -> dict:
+    def get_variant(
+        self,
+        feature_name: str,
+        context: Optional[Union[dict, UnleashContext]] = None,
+    ) -> dict:
         """
         Checks if a feature toggle is enabled.  If so, return variant.
 
@@ -487,91 +674,598 @@ class UnleashClient:
         * If client hasn't been initialized yet or an error occurs, flag will default to false.
 
         :param feature_name: Name of the feature
-        :param context: Dictionary with context (e.g. IPs, email) for feature toggle.
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
         :return: Variant and feature flag status.
         """
         context = self._safe_context(context)
+        return self._evaluate_variant(feature_name, context)
+
+    def get_json_payload(
+        self,
+        feature_name: str,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        default: Any = None,
+    ) -> Any:
+        """
+        Gets the variant of a feature toggle, and returns its payload decoded as JSON.
+
+        Each payload is decoded once per set of loaded feature toggles, and the same immutable value (objects are read-only mappings and arrays are tuples) is returned on later calls.
+
+        :param feature_name: Name of the feature
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param default: Returned if the variant has no JSON payload, or it can't be decoded.
+        :return: Decoded payload.
+        """
+        return self._get_payload(feature_name, context, "json", default)
+
+    def get_number_payload(
+        self,
+        feature_name: str,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        default: Optional[Union[int, float]] = None,
+    ) -> Optional[Union[int, float]]:
+        """
+        Gets the variant of a feature toggle, and returns its payload as a number.  The payload is decoded once per set of loaded feature toggles.
+
+        :param feature_name: Name of the feature
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param default: Returned if the variant has no number payload, or it can't be decoded.
+        :return: Payload as an int (or a float, if it has a fractional part or exponent).
+        """
+        return self._get_payload(feature_name, context, "number", default)
+
+    def get_string_payload(
+        self,
+        feature_name: str,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        default: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Gets the variant of a feature toggle, and returns its payload if it's a string.
+
+        :param feature_name: Name of the feature
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param default: Returned if the variant has no string payload.
+        :return: Payload
+        """
+        return self._get_payload(feature_name, context, "string", default)
+
+    def is_enabled_many(
+        self,
+        feature_names: Iterable[str],
+        context: Optional[Union[dict, UnleashContext]] = None,
+        fallback_function: Callable = None,
+    ) -> Dict[str, bool]:
+        """
+        Checks if several feature toggles are enabled for the same context.
+
+        The context is only normalized once.  Metrics and impression events are recorded for each feature toggle as if ``is_enabled()`` had been called for it.
+
+        :param feature_names: Names of the features
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param fallback_function: Allows users to provide a custom function to set default value.
+        :return: Dictionary of feature name to feature flag result
+        """
+        context = self._safe_context(context)
+        return {
+            feature_name: self._evaluate_is_enabled(
+                feature_name, context, fallback_function
+            )
+            for feature_name in feature_names
+        }
+
+    def get_variants_many(
+        self,
+        feature_names: Iterable[str],
+        context: Optional[Union[dict, UnleashContext]] = None,
+    ) -> Dict[str, dict]:
+        """
+        Gets the variants of several feature toggles for the same context.
+
+        The context is only normalized once.  Metrics and impression events are recorded for each feature toggle as if ``get_variant()`` had been called for it.
+
+        :param feature_names: Names of the features
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :return: Dictionary of feature name to variant and feature flag status.
+        """
+        context = self._safe_context(context)
+        return {
+            feature_name: self._evaluate_variant(feature_name, context)
+            for feature_name in feature_names
+        }
+
+    def evaluate_all(
+        self,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        enabled_only: bool = False,
+    ) -> dict:
+        """
+        Evaluates every loaded feature toggle for a context, e.g. to bootstrap a frontend SDK.
+
+        The context is only normalized once, and each feature toggle is evaluated with a single engine call.  Metrics and impression events are recorded for each feature toggle as if ``get_variant()`` had been called for it.
+
+        Example response (same shape as the Unleash frontend API):
+
+        {
+            "toggles": [
+                {
+                    "name": "feature1",
+                    "enabled": True,
+                    "variant": {"name": "disabled", "enabled": False, "feature_enabled": True},
+                    "impressionData": False,
+                }
+            ]
+        }
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param enabled_only: Whether to leave out disabled feature toggles.
+        :return: Dictionary with a list of feature toggles.
+        """
+        context = self._safe_context(context)
+        state = self._feature_state
+        toggles = []
+        for feature_name in state.features:
+            variant = self._evaluate_variant(feature_name, context)
+            feature_enabled = variant["feature_enabled"]
+            if enabled_only and not feature_enabled:
+                continue
+
+            toggles.append(
+                {
+                    "name": feature_name,
+                    "enabled": feature_enabled,
+                    "variant": variant,
+                    "impressionData": feature_name in state.impression_data_features,
+                }
+            )
+
+        return {"toggles": toggles}
+
+    @contextmanager
+    def scope(
+        self, context: Optional[Union[dict, UnleashContext]] = None
+    ) -> Iterator[EvaluationScope]:
+        """
+        Memoizes feature flag evaluations for a single context, e.g. for the duration of a web request.
+
+        Each feature flag is evaluated (and counted in metrics) the first time it is checked in the scope.  Later checks return the same result, even if new feature toggles are loaded in the meantime.  Flags first checked after new feature toggles are loaded use the new feature toggles.
+
+        .. code-block:: python
+
+            with client.scope({"userId": "123"}) as flags:
+                if flags.is_enabled("my_toggle"):
+                    variant = flags.get_variant("my_variant_toggle")
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :return: Evaluation scope
+        """
+        yield EvaluationScope(self, self._safe_context(context))
+
+    def pin(
+        self,
+        feature_name: str,
+        context: Optional[dict] = None,
+        fallback_function: Callable = None,
+    ) -> PinnedFlag:
+        """
+        Pins a feature flag to a fixed context, e.g. for service-level flags that don't depend on a user.
+
+        The flag is evaluated now and again each time new feature toggles are loaded, and ``enabled`` on the returned object is a cheap read of the stored result.  Reads are still counted in metrics.
+
+        .. code-block:: python
+
+            MAINTENANCE_MODE = client.pin("maintenance-mode", {"region": "eu"})
+
+            if MAINTENANCE_MODE.enabled:
+                ...
+
+        Notes:
+
+        * currentTime is only set when the flag is re-evaluated, so time-based constraints only take effect after the next change to the feature toggles.
+
+        :param feature_name: Name of the feature
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle.
+        :param fallback_function: Allows users to provide a custom function to set default value.
+        :return: Pinned feature flag
+        """
+        pinned_flag = PinnedFlag(
+            self,
+            feature_name,
+            normalize_context(context, self.unleash_static_context, current_time=None),
+            fallback_function,
+        )
+        # Under the state lock, so the flag can't miss a load that happens in between.
+        with self._state_lock:
+            self._refresh_pinned_flag(pinned_flag)
+            self._pinned_flags = [*self._pinned_flags, pinned_flag]
+        return pinned_flag
+
+    def unpin(self, pinned_flag: PinnedFlag) -> None:
+        """
+        Stops re-evaluating a pinned feature flag when new feature toggles are loaded.
+
+        :param pinned_flag: Pinned feature flag, as returned by ``pin()``.
+        """
+        with self._state_lock:
+            self._pinned_flags = [
+                flag for flag in self._pinned_flags if flag is not pinned_flag
+            ]
+
+    @contextmanager
+    def ambient_context(self, context: Optional[dict] = None) -> Iterator[None]:
+        """
+        Sets a base context for all evaluations in the current thread or asyncio task, e.g. from a web framework middleware.
+
+        The base context is normalized once.  While it's set, any context passed to ``is_enabled()``, ``get_variant()``, etc. only needs the extra fields for that call, and only those are normalized.  Ambient contexts can be nested, in which case the inner context is merged into the outer one.
+
+        .. code-block:: python
+
+            with client.ambient_context({"userId": "123", "sessionId": "abc"}):
+                client.is_enabled("my_toggle")
+                client.is_enabled("my_other_toggle", {"tier": "gold"})
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle.
+        """
+        base = self._ambient_context.get()
+        if base is None:
+            base = normalize_context(
+                context, self.unleash_static_context, current_time=None
+            )
+        else:
+            base = merge_context(base, context, current_time=None)
+
+        token = self._ambient_context.set(base)
+        try:
+            yield
+        finally:
+            self._ambient_context.reset(token)
+
+    def flag(self, feature_name: str) -> FeatureFlag:
+        """
+        Returns a reusable handle for a feature flag, e.g. to keep as a module-level constant.
+
+        The handle resolves per-flag lookups once for each set of loaded feature toggles, and refreshes them automatically when new feature toggles are loaded.
+
+        :param feature_name: Name of the feature
+        :return: Feature flag handle
+        """
+        return FeatureFlag(self, feature_name)
+
+    def evaluate_stream(
+        self,
+        feature_name: str,
+        contexts: Iterable[Union[dict, UnleashContext]],
+        chunk_size: int = 1000,
+        count_metrics: bool = False,
+    ) -> Iterator[List[bool]]:
+        """
+        Lazily checks if a feature toggle is enabled for each context in an iterable.
+
+        Intended for offline work (e.g. backfills or exposure analysis) over large numbers of contexts.  Contexts are consumed and evaluated one chunk at a time, and a list of results (in the same order as the contexts) is yielded for each chunk.
+
+        Notes:
+
+        * If currentTime isn't set in a context, all contexts in a chunk share the same currentTime.
+        * Unknown feature toggles evaluate to false.
+        * Impression events are not emitted.
+
+        :param feature_name: Name of the feature
+        :param contexts: Iterable of context dictionaries or UnleashContexts.
+        :param chunk_size: Number of contexts to evaluate per chunk.
+        :param count_metrics: Whether these evaluations should be counted in usage metrics, optional & defaults to false.
+        :return: Iterator of lists of feature flag results
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        contexts = iter(contexts)
+        while True:
+            chunk = list(islice(contexts, chunk_size))
+            if not chunk:
+                return
+
+            chunk_static_context = dict(self.unleash_static_context)
+            if self._current_time is not None:
+                chunk_static_context["currentTime"] = self._current_time()
+            results = []
+            for context in chunk:
+                if isinstance(context, UnleashContext):
+                    safe_context = context._fields  # pylint: disable=protected-access
+                else:
+                    safe_context = normalize_context(
+                        context,
+                        chunk_static_context,
+                        current_time=None,
+                        fields=self._context_fields,
+                    )
+
+                feature_enabled = self._compiled_is_enabled(feature_name, safe_context)
+                if feature_enabled is None:
+                    feature_enabled = bool(
+                        self.engine.is_enabled(feature_name, safe_context)
+                    )
+                if count_metrics:
+                    self._metrics.count_toggle(feature_name, feature_enabled)
+                results.append(feature_enabled)
+
+            yield results
+
+    # pylint: disable=broad-except
+    def _evaluate_is_enabled(
+        self,
+        feature_name: str,
+        context: dict,
+        fallback_function: Callable,
+        count_toggle: bool = True,
+    ) -> bool:
+        feature_enabled = self._feature_state.constant_features.get(feature_name)
+        if feature_enabled is None:
+            feature_enabled = self._compiled_is_enabled(feature_name, context)
+        if feature_enabled is None:
+            feature_enabled = self._engine_is_enabled(feature_name, context)
+
+        if feature_enabled is None:
+            self._record_unknown_flag(feature_name)
+            feature_enabled = self._get_fallback_value(
+                fallback_function, feature_name, context
+            )
+
+        if count_toggle:
+            self._metrics.count_toggle(feature_name, feature_enabled)
+        if (
+            self.unleash_event_callback
+            and feature_name in self._feature_state.impression_data_features
+        ):
+            self._emit_impression_event(
+                UnleashEventType.FEATURE_FLAG, feature_name, context, feature_enabled
+            )
+
+        return feature_enabled
+
+    # pylint: disable=broad-except
+    def _evaluate_variant(
+        self, feature_name: str, context: dict, count_toggle: bool = True
+    ) -> dict:
         variant = self._resolve_variant(feature_name, context)
 
         if not variant:
-            if self.unleash_bootstrapped or self.is_initialized:
-                LOGGER.log(
-                    self.unleash_verbose_log_level,
-                    "Attempted to get feature flag/variation %s, but client wasn't initialized!",
-                    feature_name,
-                )
+            self._record_unknown_flag(feature_name, log=True)
             variant = DISABLED_VARIATION
 
-        self.engine.count_variant(feature_name, variant["name"])
-        self.engine.count_toggle(feature_name, variant["feature_enabled"])
+        self._metrics.count_variant(feature_name, variant["name"])
+        if count_toggle:
+            self._metrics.count_toggle(feature_name, variant["feature_enabled"])
 
-        if self.unleash_event_callback and self.engine.should_emit_impression_event(
-            feature_name
+        if (
+            self.unleash_event_callback
+            and feature_name in self._feature_state.impression_data_features
         ):
-            try:
-                event = UnleashEvent(
-                    event_type=UnleashEventType.VARIANT,
-                    event_id=uuid.uuid4(),
-                    context=context,
-                    enabled=variant["enabled"],
-                    feature_name=feature_name,
-                    variant=variant["name"],
-                )
-
-                self.unleash_event_callback(event)
-            except Exception as excep:
-                LOGGER.log(
-                    self.unleash_verbose_log_level,
-                    "Error in event callback: %s",
-                    excep,
-                )
+            self._emit_impression_event(
+                UnleashEventType.VARIANT,
+                feature_name,
+                context,
+                variant["enabled"],
+                variant["name"],
+            )
 
         return variant
 
+    def _get_payload(
+        self,
+        feature_name: str,
+        context: Optional[Union[dict, UnleashContext]],
+        payload_type: str,
+        default: Any,
+    ) -> Any:
+        variant = self.get_variant(feature_name, context)
+        payload = variant.get("payload")
+        if not payload or payload.get("type") != payload_type:
+            return default
+
+        try:
+            return self.payload_cache.decode(
+                feature_name, variant["name"], payload_type, payload["value"]
+            )
+        except ValueError as excep:
+            LOGGER.warning(
+                "Could not decode %s payload of variant %s of feature flag %s: %s",
+                payload_type,
+                variant["name"],
+                feature_name,
+                excep,
+            )
+            return default
+
+    def _record_unknown_flag(self, feature_name: str, log: bool = False) -> None:
+        if not (self.unleash_bootstrapped or self.is_initialized):
+            return
+
+        suppressed = self.unknown_flags.record(feature_name, log)
+        if suppressed is None:
+            return
+
+        if suppressed:
+            LOGGER.log(
+                self.unleash_verbose_log_level,
+                "Attempted to get feature flag/variation %s, but client wasn't initialized! (%s similar messages suppressed)",
+                feature_name,
+                suppressed,
+            )
+        else:
+            LOGGER.log(
+                self.unleash_verbose_log_level,
+                "Attempted to get feature flag/variation %s, but client wasn't initialized!",
+                feature_name,
+            )
+
+    # pylint: disable=broad-except
+    def _emit_impression_event(
+        self,
+        event_type: UnleashEventType,
+        feature_name: str,
+        context: dict,
+        enabled: bool,
+        variant: str = "",
+    ) -> None:
+        try:
+            event = UnleashEvent(
+                event_type=event_type,
+                event_id=uuid.uuid4(),
+                context=copy_context(context),
+                enabled=enabled,
+                feature_name=feature_name,
+                variant=variant,
+            )
+
+            self.unleash_event_callback(event)
+        except Exception as excep:
+            LOGGER.log(
+                self.unleash_verbose_log_level,
+                "Error in event callback: %s",
+                excep,
+            )
+
+    def build_context(self, context: Optional[dict] = None) -> UnleashContext:
+        """
+        Builds a pre-normalized context that can be reused across many evaluations.
+
+        The client's static context (appName, environment) is included.  Pass the result to ``is_enabled()`` or ``get_variant()`` in place of a dictionary to skip normalizing the context on every call.
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle.
+        :return: Immutable, normalized context.
+        """
+        # Not pruned, as the context may outlive the currently loaded feature toggles.
+        return UnleashContext.from_normalized(
+            normalize_context(context, self.unleash_static_context, current_time=None)
+        )
+
     def _safe_context(self, context) -> dict:
-        new_context: Dict[str, Any] = self.unleash_static_context.copy()
-        new_context.update(context or {})
+        if isinstance(context, UnleashContext):
+            return context._fields  # pylint: disable=protected-access
 
-        if "currentTime" not in new_context:
-            new_context["currentTime"] = datetime.now(timezone.utc).isoformat()
+        ambient_context = self._ambient_context.get()
+        if ambient_context is not None:
+            return merge_context(
+                ambient_context, context, self._current_time, self._context_fields
+            )
 
-        safe_properties = self._extract_properties(new_context)
-        safe_properties = {
-            k: self._safe_context_value(v) for k, v in safe_properties.items()
-        }
-        safe_context = {
-            k: self._safe_context_value(v)
-            for k, v in new_context.items()
-            if k != "properties"
-        }
+        return normalize_context(
+            context,
+            self.unleash_static_context,
+            self._current_time,
+            self._context_fields,
+        )
+
+    def _on_state_loaded(self, state: str) -> None:
+        # Features can be loaded from the scheduler and from the caller's thread (bootstrapping, initialize_client()), so loads are serialized.
+        with self._state_lock:
+            if state == self._loaded_state:
+                return
+
+            generation = self._state_generation + 1
+            self._feature_state = FeatureState.from_json(
+                state,
+                generation,
+                self.strategy_mapping,
+                self.unleash_compile_features,
+            )
+            self._loaded_state = state
+            self._state_generation = generation
+            # currentTime is only needed in the context if a loaded feature toggle may read it.
+            self._current_time = (
+                self._clock if self._feature_state.uses_current_time else None
+            )
+            if self.unleash_prune_context:
+                self._context_fields = self._feature_state.context_fields
 
-        safe_context["properties"] = safe_properties
+            if self.result_cache is not None:
+                self.result_cache.clear(generation)
+            self.payload_cache.clear()
 
-        return safe_context
+            for pinned_flag in self._pinned_flags:
+                self._refresh_pinned_flag(pinned_flag)
 
-    def _extract_properties(self, context: dict) -> dict:
-        properties = context.get("properties", {})
-        extracted_fields = {
-            k: v for k, v in context.items() if k not in _BASE_CONTEXT_FIELDS
-        }
-        extracted_fields.update(properties)
-        return extracted_fields
+    def _refresh_pinned_flag(self, pinned_flag: PinnedFlag) -> None:
+        try:
+            pinned_flag.refresh()
+        except Exception as excep:  # pylint: disable=broad-except
+            LOGGER.warning(
+                "Could not evaluate pinned feature flag %s: %s",
+                pinned_flag.name,
+                excep,
+            )
+
+    def _compiled_is_enabled(self, feature_name: str, context: dict) -> Optional[bool]:
+        evaluator = self._feature_state.compiled_features.get(feature_name)
+        if evaluator is None:
+            return None
+
+        feature_enabled = evaluator(context)
+        if feature_enabled is not None and self.unleash_verify_compiled_features:
+            engine_enabled = self.engine.is_enabled(feature_name, context)
+            if engine_enabled != feature_enabled:
+                self.compiled_mismatches += 1
+                LOGGER.warning(
+                    "Compiled evaluation of feature flag %s returned %s, but the engine returned %s, for context: %s",
+                    feature_name,
+                    feature_enabled,
+                    engine_enabled,
+                    context,
+                )
+                return engine_enabled
 
-    def _safe_context_value(self, value):
-        if isinstance(value, datetime):
-            return value.isoformat()
-        if isinstance(value, (int, float)):
-            return str(value)
-        return str(value)
+        return feature_enabled
+
+    def _engine_is_enabled(self, feature_name: str, context: dict) -> Optional[bool]:
+        if self.result_cache is None or not self._feature_state.is_cacheable(
+            feature_name, context
+        ):
+            return self.engine.is_enabled(feature_name, context)
+
+        return self.result_cache.get_or_compute(
+            (feature_name, False, context_fingerprint(context)),
+            lambda: self.engine.is_enabled(feature_name, context),
+        )
 
     def _resolve_variant(self, feature_name: str, context: dict) -> dict:
         """
         Resolves a feature variant.
         """
+        if self.result_cache is None or not self._feature_state.is_cacheable(
+            feature_name, context
+        ):
+            return self._engine_get_variant(feature_name, context)
+
+        variant = self.result_cache.get_or_compute(
+            (feature_name, True, context_fingerprint(context)),
+            lambda: self._engine_get_variant(feature_name, context),
+        )
+        if not variant:
+            return None
+        # Cached variants are shared, so hand out a copy, including the payload.
+        variant = dict(variant)
+        if "payload" in variant:
+            variant["payload"] = dict(variant["payload"])
+        return variant
+
+    def _engine_get_variant(self, feature_name: str, context: dict) -> dict:
         variant = self.engine.get_variant(feature_name, context)
-        if variant:
-            return {k: v for k, v in asdict(variant).items() if v is not None}
-        return None
+        if not variant:
+            return None
+
+        # Built by hand, as dataclasses.asdict() deep-copies the (freshly decoded) payload.
+        if variant.payload is None:
+            return {
+                "name": variant.name,
+                "enabled": variant.enabled,
+                "feature_enabled": variant.feature_enabled,
+            }
+        return {
+            "name": variant.name,
+            "payload": variant.payload,
+            "enabled": variant.enabled,
+            "feature_enabled": variant.feature_enabled,
+        }
 
     def _do_instance_check(self, multiple_instance_mode):
         identifier = self.__get_identifier()
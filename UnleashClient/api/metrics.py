@@ -1,4 +1,6 @@
+import gzip
 import json
+from typing import Optional
 
 import requests
 
@@ -12,7 +14,8 @@ def send_metrics(
     request_body: dict,
     headers: dict,
     custom_options: dict,
-    request_timeout: int,
+    request_timeout: float,
+    compression_threshold: Optional[int] = None,
 ) -> bool:
     """
     Attempts to send metrics to Unleash server
@@ -25,16 +28,23 @@ def send_metrics(
     :param headers:
     :param custom_options:
     :param request_timeout:
+    :param compression_threshold: Gzip the request body if it's at least this many bytes.  If None, the body is never compressed.
     :return: true if registration successful, false if registration unsuccessful or exception.
     """
     try:
         LOGGER.info("Sending messages to with unleash @ %s", url)
         LOGGER.info("unleash metrics information: %s", request_body)
 
+        data = json.dumps(request_body).encode("utf-8")
+        request_headers = {**headers, **APPLICATION_HEADERS}
+        if compression_threshold is not None and len(data) >= compression_threshold:
+            data = gzip.compress(data, compresslevel=6)
+            request_headers["Content-Encoding"] = "gzip"
+
         resp = requests.post(
             url + METRICS_URL,
-            data=json.dumps(request_body),
-            headers={**headers, **APPLICATION_HEADERS},
+            data=data,
+            headers=request_headers,
             timeout=request_timeout,
             **custom_options,
         )
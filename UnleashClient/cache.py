@@ -1,6 +1,7 @@
 import abc
 import json
 from pathlib import Path
+from threading import RLock
 from typing import Any, Optional
 
 import requests
@@ -81,6 +82,7 @@ class FileCache(BaseCache):
         request_timeout: int = REQUEST_TIMEOUT,
     ):
         self._cache = _FileCache(name, app_cache_dir=directory)
+        self._lock = RLock()
         self.request_timeout = request_timeout
 
     def bootstrap_from_dict(self, initial_config: dict) -> None:
@@ -126,18 +128,23 @@ class FileCache(BaseCache):
         self.bootstrapped = True
 
     def set(self, key: str, value: Any):
-        self._cache[key] = value
-        self._cache.sync()
+        with self._lock:
+            self._cache[key] = value
+            self._cache.sync()
 
     def mset(self, data: dict):
-        self._cache.update(data)
-        self._cache.sync()
+        with self._lock:
+            self._cache.update(data)
+            self._cache.sync()
 
     def get(self, key: str, default: Optional[Any] = None):
-        return self._cache.get(key, default)
+        with self._lock:
+            return self._cache.get(key, default)
 
     def exists(self, key: str):
-        return key in self._cache
+        with self._lock:
+            return key in self._cache
 
     def destroy(self):
-        return self._cache.delete()
+        with self._lock:
+            return self._cache.delete()
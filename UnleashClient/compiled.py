@@ -0,0 +1,172 @@
+from typing import Callable, List, Optional
+
+from UnleashClient.context import _BASE_CONTEXT_FIELDS
+from UnleashClient.utils import normalized_hash
+
+#: Evaluates a feature toggle for a normalized context.  Returns None if the engine has to evaluate it instead.
+Evaluator = Callable[[dict], Optional[bool]]
+_Check = Callable[[dict], Optional[bool]]
+
+
+def _context_getter(field: str) -> Callable[[dict], Optional[str]]:
+    if field in _BASE_CONTEXT_FIELDS:
+        # Like the engine, standard fields fall back to properties.
+        def get_base_field(context: dict) -> Optional[str]:
+            value = context.get(field)
+            if value is None:
+                return context["properties"].get(field)
+            return value
+
+        return get_base_field
+    return lambda context: context["properties"].get(field)
+
+
+def _compile_constraint(constraint: dict) -> Optional[_Check]:
+    operator = constraint.get("operator")
+    field = constraint.get("contextName")
+    if operator not in ("IN", "NOT_IN") or not field or field == "currentTime":
+        return None
+
+    get_value = _context_getter(field)
+    values = frozenset(constraint.get("values") or [])
+    # A constraint is satisfied if (value in values) == expected.
+    expected = (operator == "IN") != bool(constraint.get("inverted"))
+
+    return lambda context: (get_value(context) in values) == expected
+
+
+def _always(context: dict) -> Optional[bool]:
+    return True
+
+
+def _never(context: dict) -> Optional[bool]:
+    return False
+
+
+def _compile_rollout(feature_name: str, parameters: dict) -> Optional[_Check]:
+    rollout_value = parameters.get("rollout")
+    # Anything but a plain percentage string is left to the engine.
+    if not (
+        isinstance(rollout_value, str)
+        and rollout_value.isdecimal()
+        and rollout_value.isascii()
+    ):
+        return None
+    rollout = int(rollout_value)
+    if rollout > 100:
+        return None
+
+    if rollout == 0:
+        return _never
+
+    # The engine hashes with an empty groupId as given.
+    group_id = parameters.get("groupId", feature_name)
+    stickiness = parameters.get("stickiness") or "default"
+    if stickiness == "random":
+        return _always if rollout >= 100 else None
+
+    if stickiness == "default":
+        get_user_id = _context_getter("userId")
+        get_session_id = _context_getter("sessionId")
+
+        def check_default(context: dict) -> Optional[bool]:
+            value = get_user_id(context) or get_session_id(context)
+            if value is None:
+                # Falls back to random stickiness, which is left to the engine.
+                return True if rollout >= 100 else None
+            return normalized_hash(value, group_id) <= rollout
+
+        return check_default
+
+    get_value = _context_getter(stickiness)
+
+    def check(context: dict) -> Optional[bool]:
+        value = get_value(context)
+        if value is None:
+            return False
+        return normalized_hash(value, group_id) <= rollout
+
+    return check
+
+
+def _compile_strategy(feature_name: str, strategy: dict) -> Optional[_Check]:
+    if strategy.get("segments"):
+        return None
+
+    constraints: List[_Check] = []
+    for constraint in strategy.get("constraints") or []:
+        compiled_constraint = _compile_constraint(constraint)
+        if compiled_constraint is None:
+            return None
+        constraints.append(compiled_constraint)
+
+    name = strategy.get("name")
+    parameters = strategy.get("parameters") or {}
+    strategy_check: Optional[_Check]
+    if name == "default":
+        strategy_check = _always
+    elif name == "userWithId":
+        user_ids = frozenset(
+            user_id.strip() for user_id in str(parameters.get("userIds", "")).split(",")
+        )
+
+        get_user_id = _context_getter("userId")
+
+        def strategy_check(context: dict) -> Optional[bool]:
+            return get_user_id(context) in user_ids
+
+    elif name == "flexibleRollout":
+        strategy_check = _compile_rollout(feature_name, parameters)
+    else:
+        strategy_check = None
+
+    if strategy_check is None:
+        return None
+    if not constraints:
+        return strategy_check
+
+    check = strategy_check
+
+    def constrained_check(context: dict) -> Optional[bool]:
+        for constraint in constraints:
+            if not constraint(context):
+                return False
+        return check(context)
+
+    return constrained_check
+
+
+def compile_feature(feature: dict) -> Optional[Evaluator]:
+    """
+    Compiles a feature toggle into a Python function, if it only uses simple strategies.
+
+    Supported are the ``default``, ``userWithId`` and ``flexibleRollout`` strategies, with ``IN``/``NOT_IN`` constraints and no segments.  Feature toggles with dependencies, or any other strategy or constraint, aren't compiled.
+
+    :param feature: Feature toggle, as returned by the Unleash API.
+    :return: Evaluator, or None if the feature toggle can't be compiled.
+    """
+    if not feature.get("enabled") or feature.get("dependencies"):
+        return None
+
+    name = feature["name"]
+    checks: List[_Check] = []
+    for strategy in feature.get("strategies") or []:
+        check = _compile_strategy(name, strategy)
+        if check is None:
+            return None
+        checks.append(check)
+
+    if not checks:
+        return None
+
+    def evaluate(context: dict) -> Optional[bool]:
+        result: Optional[bool] = False
+        for check in checks:
+            enabled = check(context)
+            if enabled:
+                return True
+            if enabled is None:
+                result = None
+        return result
+
+    return evaluate
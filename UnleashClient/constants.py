@@ -6,6 +6,7 @@ SDK_VERSION = version("UnleashClient")
 REQUEST_TIMEOUT = 30
 REQUEST_RETRIES = 3
 METRIC_LAST_SENT_TIME = "mlst"
+METRICS_COMPRESSION_THRESHOLD = 1024
 CLIENT_SPEC_VERSION = "5.1.9"
 
 # =Unleash=
@@ -13,7 +14,11 @@ APPLICATION_HEADERS = {
     "Content-Type": "application/json",
     "Unleash-Client-Spec": CLIENT_SPEC_VERSION,
 }
-DISABLED_VARIATION = {"name": "disabled", "enabled": False, "feature_enabled": False}
+DISABLED_VARIATION: dict = {
+    "name": "disabled",
+    "enabled": False,
+    "feature_enabled": False,
+}
 
 # Paths
 REGISTER_URL = "/client/register"
@@ -0,0 +1,230 @@
+import time
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import AbstractSet, Any, Callable, Dict, Iterator, Optional
+
+_BASE_CONTEXT_FIELDS = frozenset(
+    [
+        "userId",
+        "sessionId",
+        "environment",
+        "appName",
+        "currentTime",
+        "remoteAddress",
+        "properties",
+    ]
+)
+
+
+def utc_now_isoformat() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class CoarseClock:
+    """
+    Returns the current UTC time as an ISO 8601 string, formatting it at most once per resolution.
+
+    :param resolution_ms: How long (in milliseconds) to reuse a formatted time for.
+    """
+
+    __slots__ = ("resolution", "_value", "_expires_at")
+
+    def __init__(self, resolution_ms: int) -> None:
+        self.resolution = resolution_ms / 1000
+        self._value = ""
+        self._expires_at = 0.0
+
+    def __call__(self) -> str:
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self._value = utc_now_isoformat()
+            self._expires_at = now + self.resolution
+        return self._value
+
+
+def safe_context_value(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def extract_properties(context: dict) -> dict:
+    properties = context.get("properties", {})
+    extracted_fields = {
+        k: v for k, v in context.items() if k not in _BASE_CONTEXT_FIELDS
+    }
+    extracted_fields.update(properties)
+    return extracted_fields
+
+
+def normalize_context(
+    context: Optional[dict] = None,
+    static_context: Optional[dict] = None,
+    current_time: Optional[Callable[[], str]] = utc_now_isoformat,
+    fields: Optional[AbstractSet[str]] = None,
+) -> dict:
+    """
+    Normalizes a context dictionary into the shape expected by the evaluation engine.
+
+    * Static context (e.g. appName, environment) is merged in underneath the supplied context.
+    * currentTime is set from ``current_time`` if not supplied.
+    * Custom fields in the root of the context are copied into properties.
+    * All values are converted into strings.
+    * If ``fields`` is set, custom fields that aren't in it are dropped.
+
+    :param context: Context supplied by the caller.
+    :param static_context: Context fields that apply to every evaluation.
+    :param current_time: Returns the current time as an ISO 8601 string.  If None, currentTime isn't set.
+    :param fields: Context fields to keep, in addition to the standard fields.  If None, all fields are kept.
+    :return: Normalized context.
+    """
+    new_context: Dict[str, Any] = dict(static_context or {})
+    new_context.update(context or {})
+
+    if current_time is not None and "currentTime" not in new_context:
+        new_context["currentTime"] = current_time()
+
+    if fields is None:
+        safe_properties = {
+            k: safe_context_value(v) for k, v in extract_properties(new_context).items()
+        }
+        safe_context: Dict[str, Any] = {
+            k: safe_context_value(v)
+            for k, v in new_context.items()
+            if k != "properties"
+        }
+    else:
+        safe_properties = {
+            k: safe_context_value(v)
+            for k, v in extract_properties(new_context).items()
+            if k in fields
+        }
+        safe_context = {
+            k: safe_context_value(v)
+            for k, v in new_context.items()
+            if k != "properties" and (k in _BASE_CONTEXT_FIELDS or k in fields)
+        }
+
+    safe_context["properties"] = safe_properties
+
+    return safe_context
+
+
+def copy_context(context: dict) -> dict:
+    """
+    Copies a normalized context, including its properties, so it can be handed to user code without exposing the original.
+
+    :param context: Normalized context.
+    :return: Copy of the context.
+    """
+    copied = dict(context)
+    copied["properties"] = dict(copied["properties"])
+    return copied
+
+
+def merge_context(
+    base: dict,
+    context: Optional[dict] = None,
+    current_time: Optional[Callable[[], str]] = utc_now_isoformat,
+    fields: Optional[AbstractSet[str]] = None,
+) -> dict:
+    """
+    Merges a context into an already normalized base context.  Only the supplied context is normalized.
+
+    :param base: Normalized context.
+    :param context: Context supplied by the caller, whose fields take precedence over the base.
+    :param current_time: Returns the current time as an ISO 8601 string.  If None, currentTime isn't set.
+    :param fields: Custom context fields to keep from the supplied context.  If None, all fields are kept.
+    :return: Normalized context.  It may be ``base`` itself or share its properties, so it mustn't be modified; use ``copy_context()`` before handing it to user code.
+    """
+    if not context:
+        if current_time is None or "currentTime" in base:
+            return base
+        merged = dict(base)
+    else:
+        delta = normalize_context(context, current_time=None, fields=fields)
+        properties = delta["properties"]
+        merged = {**base, **delta}
+        if properties:
+            merged["properties"] = {**base["properties"], **properties}
+        else:
+            merged["properties"] = base["properties"]
+
+    if current_time is not None and "currentTime" not in merged:
+        merged["currentTime"] = current_time()
+
+    return merged
+
+
+class UnleashContext(Mapping):
+    """
+    An immutable, pre-normalized evaluation context.
+
+    Normalizing a context has a cost that is paid on every ``is_enabled()`` or ``get_variant()`` call made with a plain dictionary.
+    If the same context is used for many evaluations (e.g. all the flags checked while serving a web request), build an ``UnleashContext`` once and pass it in instead.
+
+    The easiest way to create one is through the client, which includes the static context (appName, environment) for you:
+
+    .. code-block:: python
+
+        context = client.build_context({"userId": "123", "tier": "gold"})
+        client.is_enabled("my_toggle", context)
+        client.get_variant("my_variant_toggle", context)
+
+    Notes:
+
+    * currentTime isn't set unless supplied, so the current time is used for each evaluation.
+    * The context is a read-only mapping, and can be read like a dictionary.  ``properties`` is read-only as well; use ``as_dict()`` for a mutable copy.
+
+    :param context: Context fields, in the same shape as accepted by ``is_enabled()``.
+    :param static_context: Context fields that apply to every evaluation.
+    """
+
+    __slots__ = ("_fields",)
+
+    _fields: dict
+
+    def __init__(
+        self, context: Optional[dict] = None, static_context: Optional[dict] = None
+    ) -> None:
+        object.__setattr__(
+            self,
+            "_fields",
+            normalize_context(context, static_context, current_time=None),
+        )
+
+    @classmethod
+    def from_normalized(cls, context: dict) -> "UnleashContext":
+        """
+        Wraps an already normalized context without normalizing it again.
+        """
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "_fields", context)
+        return instance
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "properties":
+            return MappingProxyType(self._fields["properties"])
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("UnleashContext is immutable.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("UnleashContext is immutable.")
+
+    def __repr__(self) -> str:
+        return f"UnleashContext({self._fields!r})"
+
+    def as_dict(self) -> dict:
+        """
+        Returns a mutable copy of the normalized context.
+        """
+        return copy_context(self._fields)
@@ -0,0 +1,233 @@
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from UnleashClient.context import UnleashContext, merge_context
+from UnleashClient.events import UnleashEventType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from UnleashClient import UnleashClient
+    from UnleashClient.state import FeatureState
+
+
+# pylint: disable=protected-access
+class FeatureFlag:
+    """
+    Reusable handle for a single feature flag.  Use ``UnleashClient.flag()`` to create one.
+
+    Everything that can be looked up once per set of loaded feature toggles (whether the flag exists, if it emits impression events, and its result if it doesn't depend on the context) is resolved on first use, and again after new feature toggles are loaded.
+
+    .. code-block:: python
+
+        CHECKOUT_V2 = client.flag("checkout-v2")
+
+        if CHECKOUT_V2.enabled({"userId": "123"}):
+            ...
+
+    :param client: Client used to evaluate the feature flag.
+    :param name: Name of the feature
+    """
+
+    __slots__ = (
+        "_client",
+        "name",
+        "_state",
+        "_exists",
+        "_impression_data",
+        "_constant",
+    )
+
+    def __init__(self, client: "UnleashClient", name: str) -> None:
+        self._client = client
+        self.name = name
+        self._state: Optional["FeatureState"] = None
+        self._exists = False
+        self._impression_data = False
+        self._constant: Optional[bool] = None
+
+    def _resolve(self) -> None:
+        state = self._client._feature_state
+        if state is not self._state:
+            self._exists = self.name in state.features
+            self._impression_data = self.name in state.impression_data_features
+            self._constant = state.constant_features.get(self.name)
+            self._state = state
+
+    @property
+    def exists(self) -> bool:
+        """
+        Whether the feature flag is in the currently loaded feature toggles.
+        """
+        self._resolve()
+        return self._exists
+
+    @property
+    def impression_data(self) -> bool:
+        """
+        Whether the feature flag emits impression events.
+        """
+        self._resolve()
+        return self._impression_data
+
+    def enabled(
+        self,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        fallback_function: Callable = None,
+    ) -> bool:
+        """
+        Checks if the feature flag is enabled.  Same as ``UnleashClient.is_enabled()``.
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param fallback_function: Allows users to provide a custom function to set default value.
+        :return: Feature flag result
+        """
+        self._resolve()
+        client = self._client
+        feature_enabled = self._constant
+        if feature_enabled is None:
+            return client._evaluate_is_enabled(
+                self.name, client._safe_context(context), fallback_function
+            )
+
+        client._metrics.count_toggle(self.name, feature_enabled)
+        if self._impression_data and client.unleash_event_callback:
+            client._emit_impression_event(
+                UnleashEventType.FEATURE_FLAG,
+                self.name,
+                client._safe_context(context),
+                feature_enabled,
+            )
+
+        return feature_enabled
+
+    def variant(self, context: Optional[Union[dict, UnleashContext]] = None) -> dict:
+        """
+        Gets the variant of the feature flag.  Same as ``UnleashClient.get_variant()``.
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :return: Variant and feature flag status.
+        """
+        client = self._client
+        return client._evaluate_variant(self.name, client._safe_context(context))
+
+    def json_payload(
+        self, context: Optional[Union[dict, UnleashContext]] = None, default: Any = None
+    ) -> Any:
+        """
+        Gets the variant of the feature flag, and returns its payload decoded as JSON.  Same as ``UnleashClient.get_json_payload()``.
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param default: Returned if the variant has no JSON payload, or it can't be decoded.
+        :return: Decoded payload.
+        """
+        return self._client._get_payload(self.name, context, "json", default)
+
+    def number_payload(
+        self,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        default: Optional[Union[int, float]] = None,
+    ) -> Optional[Union[int, float]]:
+        """
+        Gets the variant of the feature flag, and returns its payload as a number.  Same as ``UnleashClient.get_number_payload()``.
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param default: Returned if the variant has no number payload, or it can't be decoded.
+        :return: Payload as an int (or a float, if it has a fractional part or exponent).
+        """
+        return self._client._get_payload(self.name, context, "number", default)
+
+    def string_payload(
+        self,
+        context: Optional[Union[dict, UnleashContext]] = None,
+        default: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Gets the variant of the feature flag, and returns its payload if it's a string.  Same as ``UnleashClient.get_string_payload()``.
+
+        :param context: Dictionary with context (e.g. IPs, email) for feature toggle, or an UnleashContext from ``build_context()``.
+        :param default: Returned if the variant has no string payload.
+        :return: Payload
+        """
+        return self._client._get_payload(self.name, context, "string", default)
+
+    def __repr__(self) -> str:
+        return f"FeatureFlag({self.name!r})"
+
+
+# pylint: disable=protected-access
+class PinnedFlag:
+    """
+    A feature flag evaluated for a fixed context.  Use ``UnleashClient.pin()`` to create one.
+
+    The flag is evaluated when it's pinned and again each time new feature toggles are loaded.  Reading ``enabled`` returns the stored result without normalizing the context or calling the engine, but is still counted in metrics.
+
+    :param client: Client used to evaluate the feature flag.
+    :param name: Name of the feature
+    :param context: Normalized context, without currentTime.
+    :param fallback_function: Allows users to provide a custom function to set default value.
+    """
+
+    __slots__ = (
+        "_client",
+        "name",
+        "_context",
+        "_fallback_function",
+        "_enabled",
+        "_impression_data",
+    )
+
+    def __init__(
+        self,
+        client: "UnleashClient",
+        name: str,
+        context: dict,
+        fallback_function: Callable = None,
+    ) -> None:
+        self._client = client
+        self.name = name
+        self._context = context
+        self._fallback_function = fallback_function
+        self._enabled = False
+        self._impression_data = False
+
+    @property
+    def context(self) -> UnleashContext:
+        """
+        The pinned context, as a read-only ``UnleashContext``.
+        """
+        return UnleashContext.from_normalized(self._context)
+
+    def refresh(self) -> None:
+        """
+        Evaluates the feature flag against the currently loaded feature toggles.
+        """
+        client = self._client
+        context = merge_context(self._context, current_time=client._current_time)
+        feature_enabled = client.engine.is_enabled(self.name, context)
+        if feature_enabled is None:
+            feature_enabled = client._get_fallback_value(
+                self._fallback_function, self.name, context
+            )
+
+        self._impression_data = (
+            self.name in client._feature_state.impression_data_features
+        )
+        self._enabled = bool(feature_enabled)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the feature flag is enabled for the pinned context.
+        """
+        client = self._client
+        feature_enabled = self._enabled
+        client._metrics.count_toggle(self.name, feature_enabled)
+        if self._impression_data and client.unleash_event_callback:
+            client._emit_impression_event(
+                UnleashEventType.FEATURE_FLAG, self.name, self._context, feature_enabled
+            )
+        return feature_enabled
+
+    def __bool__(self) -> bool:
+        return self.enabled
+
+    def __repr__(self) -> str:
+        return f"PinnedFlag({self.name!r}, enabled={self._enabled!r})"
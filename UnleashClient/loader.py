@@ -11,12 +11,15 @@ def load_features(
     cache: BaseCache,
     engine: UnleashEngine,
     ready_callback: Optional[Callable] = None,
+    state_callback: Optional[Callable[[str], None]] = None,
 ) -> None:
     """
     Caching
 
     :param cache: Should be the cache class variable from UnleashClient
     :param feature_toggles: Should be a JSON string containing the feature toggles, equivalent to the response from Unleash API
+    :param ready_callback: Called after features are successfully loaded into the engine.
+    :param state_callback: Called with the raw feature provisioning after it is successfully loaded into the engine.
     :return:
     """
     # Pull raw provisioning from cache.
@@ -30,6 +33,8 @@ def load_features(
 
     try:
         warnings = engine.take_state(feature_provisioning)
+        if state_callback:
+            state_callback(feature_provisioning)
         if ready_callback:
             ready_callback()
         if warnings:
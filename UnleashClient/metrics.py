@@ -0,0 +1,356 @@
+import glob
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import count
+from typing import Dict, List, Optional, Tuple, Union
+
+from yggdrasil_engine.engine import UnleashEngine
+
+from UnleashClient.utils import LOGGER
+
+# Number of stripes used by MetricsCounter, assigned to threads in turn.
+DEFAULT_STRIPES = 16
+
+
+class _Stripe:
+    __slots__ = ("lock", "toggles", "variants")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.toggles: Dict[str, List[int]] = {}
+        self.variants: Dict[Tuple[str, str], int] = {}
+
+
+def merge_buckets(bucket: Optional[dict], other: Optional[dict]) -> Optional[dict]:
+    """
+    Merges two metrics buckets (as returned by ``UnleashEngine.get_metrics()``).
+
+    Counts are added together.  The start & stop time of the first bucket are kept, if it has any.
+
+    :param bucket: Metrics bucket, optional.
+    :param other: Metrics bucket to merge in, optional.
+    :return: Merged bucket, or None if both are empty.
+    """
+    if not other:
+        return bucket
+    if not bucket:
+        return other
+
+    toggles = bucket["toggles"]
+    for name, counts in other["toggles"].items():
+        toggle = toggles.setdefault(name, {"yes": 0, "no": 0, "variants": {}})
+        toggle["yes"] += counts["yes"]
+        toggle["no"] += counts["no"]
+        variants = toggle["variants"]
+        for variant, count in counts["variants"].items():
+            variants[variant] = variants.get(variant, 0) + count
+
+    return bucket
+
+
+class MetricsCounter:
+    """
+    Counts feature toggle & variant evaluations in Python, so they don't need a call into the engine on every evaluation.
+
+    Counts are spread over a fixed number of locked stripes (assigned to threads in turn), so threads rarely wait on each other.  ``drain()`` collects the counts into a metrics bucket in the same shape as ``UnleashEngine.get_metrics()``.
+
+    :param stripes: Number of stripes.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES) -> None:
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1.")
+
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._next_stripe = count()
+        self._next_stripe_lock = threading.Lock()
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+        self._start: Optional[str] = None
+
+    def _stripe(self) -> _Stripe:
+        if self._start is None:
+            with self._start_lock:
+                if self._start is None:
+                    self._start = datetime.now(timezone.utc).isoformat()
+        try:
+            return self._local.stripe
+        except AttributeError:
+            with self._next_stripe_lock:
+                stripe = self._stripes[next(self._next_stripe) % len(self._stripes)]
+            self._local.stripe = stripe
+            return stripe
+
+    def count_toggle(self, feature_name: str, enabled: bool) -> None:
+        """
+        Counts an evaluation of a feature toggle.
+
+        :param feature_name: Name of the feature
+        :param enabled: Result of the evaluation.
+        """
+        stripe = self._stripe()
+        with stripe.lock:
+            counts = stripe.toggles.get(feature_name)
+            if counts is None:
+                counts = stripe.toggles[feature_name] = [0, 0]
+            counts[0 if enabled else 1] += 1
+
+    def count_variant(self, feature_name: str, variant_name: str) -> None:
+        """
+        Counts a variant of a feature toggle being returned.
+
+        :param feature_name: Name of the feature
+        :param variant_name: Name of the variant.
+        """
+        stripe = self._stripe()
+        key = (feature_name, variant_name)
+        with stripe.lock:
+            stripe.variants[key] = stripe.variants.get(key, 0) + 1
+
+    def drain(self) -> Optional[dict]:
+        """
+        Returns all counts since the last drain as a metrics bucket, and resets them.
+
+        :return: Metrics bucket, or None if nothing was counted.
+        """
+        with self._start_lock:
+            start = self._start
+            self._start = None
+
+        toggles: Dict[str, dict] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe_toggles, stripe.toggles = stripe.toggles, {}
+                stripe_variants, stripe.variants = stripe.variants, {}
+
+            for name, (yes, no) in stripe_toggles.items():
+                toggle = toggles.setdefault(name, {"yes": 0, "no": 0, "variants": {}})
+                toggle["yes"] += yes
+                toggle["no"] += no
+            for (name, variant), count in stripe_variants.items():
+                variants = toggles.setdefault(
+                    name, {"yes": 0, "no": 0, "variants": {}}
+                )["variants"]
+                variants[variant] = variants.get(variant, 0) + count
+
+        if not toggles:
+            return None
+
+        return {
+            "start": start or datetime.now(timezone.utc).isoformat(),
+            "stop": datetime.now(timezone.utc).isoformat(),
+            "toggles": toggles,
+        }
+
+
+class MetricsSampler:
+    """
+    Counts only a random sample of feature toggle & variant evaluations, to make counting very hot feature toggles cheaper.
+
+    Sampled counts are scaled back up by ``scale()`` before metrics are sent, so the reported totals are unbiased estimates of the real ones.
+
+    :param metrics: Where sampled evaluations are counted, an ``UnleashEngine`` or ``MetricsCounter``.
+    :param rate: Fraction of evaluations that are counted (between 0 and 1), for feature toggles without their own rate.
+    :param rates: Dictionary of feature name : fraction of evaluations that are counted, for individual feature toggles.
+    """
+
+    def __init__(
+        self,
+        metrics: Union[MetricsCounter, UnleashEngine],
+        rate: float = 1.0,
+        rates: Optional[Dict[str, float]] = None,
+    ) -> None:
+        rates = dict(rates or {})
+        for sample_rate in (rate, *rates.values()):
+            if not 0 < sample_rate <= 1:
+                raise ValueError("Sample rates must be greater than 0 and at most 1.")
+
+        self._metrics = metrics
+        self.rate = rate
+        self.rates = rates
+
+    def sample_rate(self, feature_name: str) -> float:
+        """
+        Returns the fraction of evaluations of a feature toggle that are counted.
+
+        :param feature_name: Name of the feature
+        """
+        return self.rates.get(feature_name, self.rate)
+
+    def count_toggle(self, feature_name: str, enabled: bool) -> None:
+        """
+        Counts an evaluation of a feature toggle, if it's sampled.
+
+        :param feature_name: Name of the feature
+        :param enabled: Result of the evaluation.
+        """
+        if random.random() < self.rates.get(feature_name, self.rate):
+            self._metrics.count_toggle(feature_name, enabled)
+
+    def count_variant(self, feature_name: str, variant_name: str) -> None:
+        """
+        Counts a variant of a feature toggle being returned, if it's sampled.
+
+        :param feature_name: Name of the feature
+        :param variant_name: Name of the variant.
+        """
+        if random.random() < self.rates.get(feature_name, self.rate):
+            self._metrics.count_variant(feature_name, variant_name)
+
+    def scale(self, bucket: Optional[dict]) -> Optional[dict]:
+        """
+        Scales sampled counts in a metrics bucket up to estimates of the real counts.
+
+        :param bucket: Metrics bucket with sampled counts, optional.
+        :return: The same bucket, scaled.
+        """
+        if not bucket:
+            return bucket
+
+        for name, toggle in bucket["toggles"].items():
+            sample_rate = self.sample_rate(name)
+            if sample_rate >= 1:
+                continue
+            toggle["yes"] = round(toggle["yes"] / sample_rate)
+            toggle["no"] = round(toggle["no"] / sample_rate)
+            variants = toggle["variants"]
+            for variant, count in variants.items():
+                variants[variant] = round(count / sample_rate)
+
+        return bucket
+
+
+class MetricsSpool:
+    """
+    Keeps metrics buckets that couldn't be sent, so they're sent with the next submission.
+
+    Spooled buckets are kept in memory, or written to a directory if one is given.  Each spooled bucket gets its own file, and files are claimed (renamed) before they're read, so processes sharing a directory never send the same bucket twice.  Buckets spooled by a process that was recycled are picked up by the next process that sends metrics.
+
+    :param directory: Directory to write spooled buckets to, optional.  If not set, buckets are only kept in memory.
+    :param max_toggles: Maximum number of feature toggles kept.  Counts for further feature toggles are dropped.
+    :param max_age: Number of seconds after which spooled buckets are dropped.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_toggles: int = 1000,
+        max_age: float = 3600.0,
+    ) -> None:
+        self.directory = directory
+        self.max_toggles = max_toggles
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # (time spooled, bucket), if kept in memory.
+        self._spooled: Optional[Tuple[float, dict]] = None
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _cap(self, bucket: dict) -> dict:
+        toggles = bucket["toggles"]
+        if len(toggles) <= self.max_toggles:
+            return bucket
+
+        LOGGER.warning(
+            "Dropping spooled metrics for %s feature toggles, as more than %s were spooled.",
+            len(toggles) - self.max_toggles,
+            self.max_toggles,
+        )
+        kept = dict(list(toggles.items())[: self.max_toggles])
+        return {**bucket, "toggles": kept}
+
+    def add(self, bucket: Optional[dict], spooled_at: Optional[float] = None) -> None:
+        """
+        Spools a metrics bucket.
+
+        :param bucket: Metrics bucket, optional.
+        :param spooled_at: Time (as returned by ``time.time()``) the oldest metrics in the bucket were first spooled, if they're being spooled again.  Defaults to now.
+        """
+        if not bucket:
+            return
+
+        bucket = self._cap(bucket)
+        if spooled_at is None:
+            spooled_at = time.time()
+        if not self.directory:
+            with self._lock:
+                if self._spooled is not None:
+                    previously_spooled_at, spooled = self._spooled
+                    spooled_at = min(spooled_at, previously_spooled_at)
+                    bucket = self._cap(merge_buckets(spooled, bucket))
+                self._spooled = (spooled_at, bucket)
+            return
+
+        path = os.path.join(self.directory, f"metrics-{uuid.uuid4().hex}.json")
+        try:
+            with open(path + ".tmp", "w") as spool_file:
+                json.dump({"spooled_at": spooled_at, "bucket": bucket}, spool_file)
+            os.replace(path + ".tmp", path)
+        except OSError as excep:
+            LOGGER.warning("Could not spool metrics to %s: %s", path, excep)
+
+    def _claim_files(self) -> List[Tuple[float, dict]]:
+        entries = []
+        claim_suffix = f".{uuid.uuid4().hex}.claimed"
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            claimed_path = path + claim_suffix
+            try:
+                # Only one process can rename the file, so only one sends it.
+                os.rename(path, claimed_path)
+            except OSError:
+                continue
+
+            try:
+                with open(claimed_path) as spool_file:
+                    entry = json.load(spool_file)
+                entries.append((entry["spooled_at"], entry["bucket"]))
+            except (OSError, ValueError, KeyError) as excep:
+                LOGGER.warning("Could not read spooled metrics %s: %s", path, excep)
+            finally:
+                try:
+                    os.remove(claimed_path)
+                except OSError:
+                    pass
+
+        return entries
+
+    def take(self) -> Tuple[Optional[dict], Optional[float]]:
+        """
+        Returns all spooled metrics as a single bucket, and removes them from the spool.
+
+        If the bucket can't be sent either, pass both values back to ``add()``, so the metrics keep their age and are still dropped after ``max_age``.
+
+        :return: Metrics bucket (None if nothing is spooled), and the time the oldest metrics in it were first spooled.
+        """
+        with self._lock:
+            entries = [self._spooled] if self._spooled is not None else []
+            self._spooled = None
+            if self.directory:
+                entries.extend(self._claim_files())
+
+        oldest = time.time() - self.max_age
+        bucket = None
+        first_spooled_at = None
+        for spooled_at, spooled in sorted(entries, key=lambda entry: entry[0]):
+            if spooled_at < oldest:
+                LOGGER.warning(
+                    "Dropping spooled metrics from %s, as they're older than %s seconds.",
+                    spooled["start"],
+                    self.max_age,
+                )
+                continue
+            if first_spooled_at is None:
+                first_spooled_at = spooled_at
+            stop = spooled["stop"]
+            bucket = merge_buckets(bucket, spooled)
+            bucket["stop"] = stop
+
+        if not bucket:
+            return None, None
+        return self._cap(bucket), first_spooled_at
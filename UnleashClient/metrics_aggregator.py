@@ -0,0 +1,184 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Optional
+
+from UnleashClient.metrics import merge_buckets
+from UnleashClient.utils import LOGGER
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+def _is_bucket(bucket: Any) -> bool:
+    # Other processes' buckets are merged into this one's, so they must be in the engine's shape.
+    if not isinstance(bucket, dict) or not isinstance(bucket.get("toggles"), dict):
+        return False
+    for counts in bucket["toggles"].values():
+        if not (
+            isinstance(counts, dict)
+            and isinstance(counts.get("yes"), int)
+            and isinstance(counts.get("no"), int)
+            and isinstance(counts.get("variants"), dict)
+            and all(isinstance(count, int) for count in counts["variants"].values())
+        ):
+            return False
+    return True
+
+
+# pylint: disable=protected-access
+class _BucketHandler(socketserver.StreamRequestHandler):
+    timeout = 5
+
+    def handle(self) -> None:
+        try:
+            bucket = json.loads(self.rfile.read())
+        except (OSError, ValueError) as excep:
+            LOGGER.warning("Could not read metrics from another process: %s", excep)
+            return
+
+        self.server.aggregator._receive(bucket)  # type: ignore[attr-defined]
+
+
+class MetricsAggregator:
+    """
+    Collects metrics from all processes on a host (e.g. gunicorn or uWSGI workers), so they're sent in a single request.
+
+    The first process to send metrics becomes the leader, by taking a lock on ``<socket_path>.lock``, and listens on a Unix socket at ``socket_path``.  Other processes hand their metrics buckets to the leader over the socket instead of sending them, and the leader merges them into its own submission.  If the leader exits, the next process that can't reach it takes over.
+
+    Only available on Unix.
+
+    :param socket_path: Path of the Unix socket.  All processes that should share metrics must use the same path.
+    :param timeout: Timeout (in seconds) for handing metrics to the leader.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 1.0) -> None:
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("MetricsAggregator is only available on Unix.")
+
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._received: Optional[dict] = None
+        self._lock_file: Optional[int] = None
+        self._server: Optional[socketserver.UnixStreamServer] = None
+        self._leader_pid: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """
+        Whether this process sends metrics for all processes.
+        """
+        # A forked child inherits the lock, but not the server thread.
+        return self._leader_pid == os.getpid()
+
+    def _push(self, bucket: dict) -> bool:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(json.dumps(bucket).encode("utf-8"))
+            return True
+        except OSError as excep:
+            LOGGER.debug("Could not hand metrics to the leader process: %s", excep)
+            return False
+
+    def _try_lead(self) -> bool:
+        try:
+            lock_file = os.open(
+                self.socket_path + ".lock", os.O_RDWR | os.O_CREAT, 0o600
+            )
+        except OSError as excep:
+            LOGGER.warning("Could not open metrics aggregator lock file: %s", excep)
+            return False
+
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(lock_file)
+            return False
+
+        try:
+            # Left behind by a leader that exited without cleaning up.
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            server = socketserver.UnixStreamServer(self.socket_path, _BucketHandler)
+        except OSError as excep:
+            LOGGER.warning(
+                "Could not listen for metrics from other processes: %s", excep
+            )
+            os.close(lock_file)
+            return False
+
+        try:
+            # Like the lock file, only this user's processes may use the socket.
+            os.chmod(self.socket_path, 0o600)
+        except OSError as excep:
+            server.server_close()
+            LOGGER.warning(
+                "Could not restrict access to the metrics aggregator socket: %s", excep
+            )
+            os.close(lock_file)
+            return False
+
+        server.aggregator = self  # type: ignore[attr-defined]
+        threading.Thread(
+            target=server.serve_forever, name="unleash-metrics-aggregator", daemon=True
+        ).start()
+
+        self._lock_file = lock_file
+        self._server = server
+        self._leader_pid = os.getpid()
+        LOGGER.info("Sending metrics for all processes using %s", self.socket_path)
+        return True
+
+    def _receive(self, bucket: Any) -> None:
+        if not _is_bucket(bucket):
+            LOGGER.warning("Dropped malformed metrics from another process.")
+            return
+
+        with self._lock:
+            self._received = merge_buckets(self._received, bucket)
+
+    def submit(self, bucket: Optional[dict]) -> Optional[dict]:
+        """
+        Hands a metrics bucket to the leader process.
+
+        :param bucket: Metrics bucket, optional.
+        :return: None if the leader will send the bucket.  Otherwise (this process is the leader, or there's no leader to hand it to) the bucket to send, with metrics received from other processes merged in.
+        """
+        if not self.is_leader:
+            if bucket and self._push(bucket):
+                return None
+            if not self._try_lead():
+                # Nobody to hand the bucket to, so it's sent directly.
+                return bucket
+
+        with self._lock:
+            received, self._received = self._received, None
+
+        if received and bucket:
+            received["start"], received["stop"] = bucket["start"], bucket["stop"]
+        return merge_buckets(received, bucket)
+
+    def close(self) -> None:
+        """
+        Stops listening for metrics from other processes and gives up leadership.  Metrics received since the last ``submit()`` are dropped.
+        """
+        if not self.is_leader:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        os.close(self._lock_file)
+        self._server = None
+        self._lock_file = None
+        self._leader_pid = None
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from UnleashClient.constants import METRICS_COMPRESSION_THRESHOLD
+from UnleashClient.metrics import MetricsSpool
+from UnleashClient.metrics_aggregator import MetricsAggregator
+
+
+@dataclass
+class ClientOptions:
+    """
+    Optional tuning for ``UnleashClient``, passed as its ``options`` argument.
+
+    .. code-block:: python
+
+        client = UnleashClient(
+            "https://unleash.herokuapp.com/api",
+            "My Program",
+            options=ClientOptions(result_cache_size=10000),
+        )
+
+    :param result_cache_size: Maximum number of evaluation results to cache per feature flag and context, optional & defaults to 0 (disabled).  Results for feature flags that can change between identical calls (random stickiness, currentTime constraints, custom strategies not declared ``pure``) are never cached.
+    :param result_cache_ttl: Seconds to cache each evaluation result for, optional & defaults to caching results until new feature flags are loaded.
+    :param current_time_resolution_ms: If set, the currentTime context field is only re-formatted once per this many milliseconds, instead of on every evaluation.  Optional & defaults to None.
+    :param prune_context: Drops custom context fields that no loaded feature flag reads before evaluating, optional & defaults to false.  Impression events and fallback functions will only see the remaining fields.
+    :param engine_shards: Number of evaluation engines to spread threads over, optional & defaults to 1.  Each thread always uses the same engine; feature toggles are loaded into all of them and their metrics are merged before sending.
+    :param buffer_metrics: Counts feature flag & variant usage in Python and only hands the counts over when metrics are sent, instead of calling into the engine on every evaluation.  Optional & defaults to false.
+    :param compile_features: Evaluates simple feature flags (``default``, ``userWithId`` and ``flexibleRollout`` strategies with ``IN``/``NOT_IN`` constraints) in Python instead of the engine, optional & defaults to false.
+    :param verify_compiled_features: Like ``compile_features``, but also evaluates those feature flags with the engine and logs (and counts, in ``compiled_mismatches``) any disagreement.  The engine's result is used.  Meant for testing, optional & defaults to false.
+    :param unknown_flag_log_interval: Minimum number of seconds between log messages about the same unknown feature flag, optional & defaults to 60.  Lookups of unknown feature flags are always counted in ``unknown_flags``.
+    :param compress_metrics: Gzips metrics sent to the Unleash server, optional & defaults to false.
+    :param metrics_compression_threshold: Minimum size (in bytes) of the metrics request body for it to be compressed, optional & defaults to 1024.  Smaller bodies are sent uncompressed.
+    :param metrics_spool: UnleashClient.metrics.MetricsSpool that keeps metrics which fail to send, so they're sent with the next submission.  When unset, metrics that fail to send are dropped.
+    :param metrics_aggregator: UnleashClient.metrics_aggregator.MetricsAggregator that collects metrics from all processes on the host, so only one process sends them.  When unset, each process sends its own metrics.
+    :param metrics_sample_rate: Fraction of feature flag evaluations counted in metrics (between 0 and 1), optional & defaults to 1.  Counts are scaled back up when metrics are sent.
+    :param metrics_sample_rates: Dictionary of feature name : fraction of evaluations counted in metrics, overriding ``metrics_sample_rate`` for individual feature flags.  Optional.
+    """
+
+    result_cache_size: int = 0
+    result_cache_ttl: Optional[float] = None
+    current_time_resolution_ms: Optional[int] = None
+    prune_context: bool = False
+    engine_shards: int = 1
+    buffer_metrics: bool = False
+    compile_features: bool = False
+    verify_compiled_features: bool = False
+    unknown_flag_log_interval: float = 60.0
+    compress_metrics: bool = False
+    metrics_compression_threshold: int = METRICS_COMPRESSION_THRESHOLD
+    metrics_spool: Optional[MetricsSpool] = None
+    metrics_aggregator: Optional[MetricsAggregator] = None
+    metrics_sample_rate: float = 1.0
+    metrics_sample_rates: Optional[Dict[str, float]] = None
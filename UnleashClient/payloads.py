@@ -0,0 +1,70 @@
+import json
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable
+
+_MISSING = object()
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively converts decoded JSON into immutable values: dictionaries become read-only mappings and lists become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def decode_number(value: str) -> Any:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+_DECODERS: Dict[str, Callable[[str], Any]] = {
+    "json": lambda value: freeze(json.loads(value)),
+    "number": decode_number,
+    "string": str,
+}
+
+
+class PayloadCache:
+    """
+    Decoded variant payloads, kept until new feature toggles are loaded.
+
+    Payloads are keyed on the feature toggle, variant and raw value, so variants with the same name but different payloads (e.g. in different strategies) don't collide.
+    """
+
+    def __init__(self) -> None:
+        self._decoded: Dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._decoded)
+
+    def decode(
+        self, feature_name: str, variant_name: str, payload_type: str, value: str
+    ) -> Any:
+        """
+        Returns a decoded, immutable payload, decoding it on first use.
+
+        :param feature_name: Name of the feature
+        :param variant_name: Name of the variant
+        :param payload_type: Payload type ("json", "number" or "string").
+        :param value: Raw payload value.
+        :return: Decoded payload.
+        :raises ValueError: If the payload can't be decoded as the given type.
+        """
+        key = (feature_name, variant_name, payload_type, value)
+        decoded = self._decoded.get(key, _MISSING)
+        if decoded is _MISSING:
+            decoded = _DECODERS[payload_type](value)
+            self._decoded[key] = decoded
+        return decoded
+
+    def clear(self) -> None:
+        """
+        Drops all decoded payloads.
+        """
+        self._decoded = {}
@@ -24,6 +24,7 @@ def fetch_and_load_features(
     project: Optional[str] = None,
     event_callback: Optional[Callable] = None,
     ready_callback: Optional[Callable] = None,
+    state_callback: Optional[Callable[[str], None]] = None,
 ) -> None:
     (state, etag) = get_feature_toggles(
         url,
@@ -47,7 +48,7 @@ def fetch_and_load_features(
     if etag:
         cache.set(ETAG, etag)
 
-    load_features(cache, engine)
+    load_features(cache, engine, state_callback=state_callback)
 
     if state:
         if event_callback:
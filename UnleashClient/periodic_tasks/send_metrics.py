@@ -1,10 +1,18 @@
 from platform import python_implementation, python_version
+from typing import Optional
 
 import yggdrasil_engine
 from yggdrasil_engine.engine import UnleashEngine
 
 from UnleashClient.api import send_metrics
 from UnleashClient.constants import CLIENT_SPEC_VERSION
+from UnleashClient.metrics import (
+    MetricsCounter,
+    MetricsSampler,
+    MetricsSpool,
+    merge_buckets,
+)
+from UnleashClient.metrics_aggregator import MetricsAggregator
 from UnleashClient.utils import LOGGER
 
 
@@ -15,10 +23,27 @@ def aggregate_and_send_metrics(
     connection_id: str,
     headers: dict,
     custom_options: dict,
-    request_timeout: int,
+    request_timeout: float,
     engine: UnleashEngine,
+    metrics_counter: Optional[MetricsCounter] = None,
+    compression_threshold: Optional[int] = None,
+    metrics_spool: Optional[MetricsSpool] = None,
+    metrics_aggregator: Optional[MetricsAggregator] = None,
+    metrics_sampler: Optional[MetricsSampler] = None,
 ) -> None:
     metrics_bucket = engine.get_metrics()
+    if metrics_counter is not None:
+        metrics_bucket = merge_buckets(metrics_bucket, metrics_counter.drain())
+    if metrics_sampler is not None:
+        metrics_bucket = metrics_sampler.scale(metrics_bucket)
+    spooled_at = None
+    if metrics_spool is not None:
+        spooled_bucket, spooled_at = metrics_spool.take()
+        if spooled_bucket and metrics_bucket:
+            spooled_bucket["stop"] = metrics_bucket["stop"]
+        metrics_bucket = merge_buckets(spooled_bucket, metrics_bucket)
+    if metrics_aggregator is not None:
+        metrics_bucket = metrics_aggregator.submit(metrics_bucket)
 
     metrics_request = {
         "appName": app_name,
@@ -32,6 +57,15 @@ def aggregate_and_send_metrics(
     }
 
     if metrics_bucket:
-        send_metrics(url, metrics_request, headers, custom_options, request_timeout)
+        sent = send_metrics(
+            url,
+            metrics_request,
+            headers,
+            custom_options,
+            request_timeout,
+            compression_threshold,
+        )
+        if not sent and metrics_spool is not None:
+            metrics_spool.add(metrics_bucket, spooled_at)
     else:
         LOGGER.debug("No feature flags with metrics, skipping metrics submission.")
@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+def context_fingerprint(context: dict) -> Hashable:
+    """
+    Builds a hashable fingerprint of a normalized context.
+
+    currentTime is left out, as it's different for nearly every call.  Only use the fingerprint for feature toggles that don't depend on currentTime.
+
+    :param context: Normalized context.
+    :return: Fingerprint
+    """
+    return (
+        frozenset(
+            item
+            for item in context.items()
+            if item[0] != "currentTime" and item[0] != "properties"
+        ),
+        frozenset(context["properties"].items()),
+    )
+
+
+class ResultCache:
+    """
+    Bounded LRU cache for feature flag evaluation results, with an optional TTL.
+
+    Results are stored for the state generation that was current when they were computed.  Calling ``clear()`` with a new generation drops all stored results, and results computed for an older generation are never stored.
+
+    :param max_size: Maximum number of results to keep.
+    :param ttl: Seconds to keep each result for, optional & defaults to keeping results until the state changes.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result for a key, computing and storing it on a miss.
+
+        :param key: Cache key.
+        :param compute: Function that computes the result.
+        :return: Result
+        """
+        generation = self.generation
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        expires_at = now + self.ttl if self.ttl is not None else float("inf")
+
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self, generation: int) -> None:
+        """
+        Drops all cached results and starts caching for a new state generation.
+
+        :param generation: New state generation.
+        """
+        with self._lock:
+            self.generation = generation
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns cache hit/miss counters and current size, e.g. for sizing the cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
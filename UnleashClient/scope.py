@@ -0,0 +1,78 @@
+from typing import TYPE_CHECKING, Callable, Dict, Set
+
+if TYPE_CHECKING:  # pragma: no cover
+    from UnleashClient import UnleashClient
+
+
+# pylint: disable=protected-access
+class EvaluationScope:
+    """
+    Memoized feature flag evaluations for a single context.  Use ``UnleashClient.scope()`` to create one.
+
+    * Each feature flag is evaluated the first time it's checked, and later checks return the memoized result.
+    * Metrics are counted once per feature flag per scope.
+    * Impression events are only emitted for the first evaluation of a feature flag.
+    * Feature flags aren't pinned to the feature toggles loaded when the scope was created.  A flag first checked after new feature toggles are loaded is evaluated against them.
+
+    :param client: Client used to evaluate feature flags.
+    :param context: Normalized context.
+    """
+
+    __slots__ = (
+        "_client",
+        "context",
+        "_enabled",
+        "_variants",
+        "_counted",
+    )
+
+    def __init__(self, client: "UnleashClient", context: dict) -> None:
+        self._client = client
+        self.context = context
+        self._enabled: Dict[str, bool] = {}
+        self._variants: Dict[str, dict] = {}
+        self._counted: Set[str] = set()
+
+    def is_enabled(self, feature_name: str, fallback_function: Callable = None) -> bool:
+        """
+        Checks if a feature toggle is enabled, evaluating it only once per scope.
+
+        :param feature_name: Name of the feature
+        :param fallback_function: Allows users to provide a custom function to set default value.
+        :return: Feature flag result
+        """
+        try:
+            return self._enabled[feature_name]
+        except KeyError:
+            pass
+
+        feature_enabled = self._client._evaluate_is_enabled(
+            feature_name,
+            self.context,
+            fallback_function,
+            count_toggle=feature_name not in self._counted,
+        )
+        self._counted.add(feature_name)
+        self._enabled[feature_name] = feature_enabled
+        return feature_enabled
+
+    def get_variant(self, feature_name: str) -> dict:
+        """
+        Gets the variant of a feature toggle, evaluating it only once per scope.
+
+        :param feature_name: Name of the feature
+        :return: Variant and feature flag status.
+        """
+        try:
+            return self._variants[feature_name]
+        except KeyError:
+            pass
+
+        variant = self._client._evaluate_variant(
+            feature_name,
+            self.context,
+            count_toggle=feature_name not in self._counted,
+        )
+        self._counted.add(feature_name)
+        self._variants[feature_name] = variant
+        return variant
@@ -0,0 +1,75 @@
+import threading
+from itertools import count
+from typing import Any, Dict, List, Optional
+
+from yggdrasil_engine.engine import FeatureDefinition, UnleashEngine, Variant
+
+from UnleashClient.metrics import merge_buckets
+
+
+# pylint: disable=super-init-not-called
+class ShardedEngine(UnleashEngine):
+    """
+    A pool of evaluation engines, used in place of a single ``UnleashEngine``.
+
+    Each thread is assigned one engine (round-robin) the first time it evaluates a feature toggle, and keeps using it.  Feature toggle state and custom strategies are loaded into every engine, and metrics from all engines are merged when they're collected.
+
+    Only the parts of the ``UnleashEngine`` interface that the client uses are supported.
+
+    :param shards: Number of engines.
+    """
+
+    def __init__(self, shards: int) -> None:
+        if shards < 1:
+            raise ValueError("shards must be at least 1.")
+
+        self.shards = [UnleashEngine() for _ in range(shards)]
+        self._next_shard = count()
+        self._next_shard_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _shard(self) -> UnleashEngine:
+        try:
+            return self._local.engine
+        except AttributeError:
+            with self._next_shard_lock:
+                engine = self.shards[next(self._next_shard) % len(self.shards)]
+            self._local.engine = engine
+            return engine
+
+    def take_state(self, state_json: str) -> Optional[List[Warning]]:
+        warnings = None
+        for engine in self.shards:
+            warnings = engine.take_state(state_json)
+        return warnings
+
+    def get_state(self) -> str:
+        return self.shards[0].get_state()
+
+    def register_custom_strategies(self, custom_strategies: dict) -> None:
+        for engine in self.shards:
+            engine.register_custom_strategies(custom_strategies)
+
+    def is_enabled(self, toggle_name: str, context: dict) -> Optional[bool]:
+        return self._shard().is_enabled(toggle_name, context)
+
+    def get_variant(self, toggle_name: str, context: dict) -> Optional[Variant]:
+        return self._shard().get_variant(toggle_name, context)
+
+    def count_toggle(self, toggle_name: str, enabled: bool) -> None:
+        self._shard().count_toggle(toggle_name, enabled)
+
+    def count_variant(self, toggle_name: str, variant_name: str) -> None:
+        self._shard().count_variant(toggle_name, variant_name)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        bucket = None
+        for engine in self.shards:
+            bucket = merge_buckets(bucket, engine.get_metrics())
+        return bucket  # type: ignore[return-value]
+
+    def should_emit_impression_event(self, toggle_name: str) -> bool:
+        return self.shards[0].should_emit_impression_event(toggle_name)
+
+    def list_known_toggles(self) -> List[FeatureDefinition]:
+        return self.shards[0].list_known_toggles()
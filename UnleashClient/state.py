@@ -0,0 +1,330 @@
+import json
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from UnleashClient.compiled import Evaluator, compile_feature
+
+# Strategies implemented by the engine.
+BUILTIN_STRATEGIES = frozenset(
+    [
+        "default",
+        "userWithId",
+        "gradualRolloutUserId",
+        "gradualRolloutSessionId",
+        "gradualRolloutRandom",
+        "flexibleRollout",
+        "remoteAddress",
+        "applicationHostname",
+    ]
+)
+
+# Context fields used (in order) when stickiness is "default".
+_DEFAULT_ROLLOUT_STICKINESS = ("userId", "sessionId")
+_DEFAULT_VARIANT_STICKINESS = ("userId", "sessionId", "remoteAddress")
+
+# Context fields read by built-in strategies, other than through constraints and stickiness.
+_STRATEGY_CONTEXT_FIELDS = {
+    "userWithId": ("userId",),
+    "gradualRolloutUserId": ("userId",),
+    "gradualRolloutSessionId": ("sessionId",),
+    "remoteAddress": ("remoteAddress",),
+}
+
+StickinessRequirement = Tuple[str, ...]
+
+
+def _strategy_constraints(strategy: dict, segments: Dict[int, dict]) -> List[dict]:
+    constraints = list(strategy.get("constraints") or [])
+    for segment_id in strategy.get("segments") or []:
+        segment = segments.get(segment_id)
+        if segment:
+            constraints.extend(segment.get("constraints") or [])
+    return constraints
+
+
+def _stickiness_requirement(
+    stickiness: Optional[str], default: StickinessRequirement
+) -> Optional[StickinessRequirement]:
+    if not stickiness or stickiness == "default":
+        return default
+    if stickiness == "random":
+        return None
+    return (stickiness,)
+
+
+def _variants_requirement(
+    variants: List[dict],
+) -> Tuple[bool, Optional[StickinessRequirement]]:
+    """
+    Returns (is_volatile, stickiness_requirement) for a list of variants.
+    """
+    weighted = [variant for variant in variants if variant.get("weight", 0) > 0]
+    if len(weighted) <= 1:
+        return False, None
+
+    requirement = _stickiness_requirement(
+        weighted[0].get("stickiness"), _DEFAULT_VARIANT_STICKINESS
+    )
+    return requirement is None, requirement
+
+
+def _flexible_rollout_requirement(
+    strategy: dict,
+) -> Tuple[bool, Optional[StickinessRequirement]]:
+    parameters = strategy.get("parameters") or {}
+    if str(parameters.get("rollout", "")).strip() in ("0", "100"):
+        return False, None
+
+    requirement = _stickiness_requirement(
+        parameters.get("stickiness"), _DEFAULT_ROLLOUT_STICKINESS
+    )
+    return requirement is None, requirement
+
+
+def _constant_result(feature: dict) -> Optional[bool]:
+    """
+    Returns the result of a feature toggle if it doesn't depend on the context, otherwise None.
+    """
+    if not feature.get("enabled"):
+        return False
+    if feature.get("dependencies"):
+        return None
+
+    strategies = feature.get("strategies") or []
+    if not strategies:
+        return True
+
+    for strategy in strategies:
+        if (
+            strategy.get("name") == "default"
+            and not strategy.get("disabled")
+            and not strategy.get("constraints")
+            and not strategy.get("segments")
+        ):
+            return True
+
+    return None
+
+
+class FeatureState:
+    """
+    Python-side index of the feature toggles that are loaded into the engine.
+
+    A new instance is built from the raw feature provisioning every time a changed set of feature toggles is loaded, so it never changes once built.
+
+    :param generation: State generation this index was built for.
+    :param features: Feature toggles, as returned by the Unleash API.
+    :param segments: Segments, as returned by the Unleash API.
+    :param custom_strategies: Dictionary of custom strategy names : custom strategy objects.  A custom strategy object can set ``pure = True`` if its result depends only on its parameters and the context, and ``context_fields`` to the context fields it reads.
+    :param compile_features: Whether to compile simple feature toggles into Python functions.
+    """
+
+    def __init__(
+        self,
+        generation: int = 0,
+        features: Optional[List[dict]] = None,
+        segments: Optional[List[dict]] = None,
+        custom_strategies: Optional[dict] = None,
+        compile_features: bool = False,
+    ) -> None:
+        self.generation = generation
+        self.features: Dict[str, dict] = {
+            feature["name"]: feature for feature in features or []
+        }
+        self.segments: Dict[int, dict] = {
+            segment["id"]: segment for segment in segments or []
+        }
+        custom_strategies = custom_strategies or {}
+        self.pure_strategies = frozenset(
+            name
+            for name, strategy in custom_strategies.items()
+            if getattr(strategy, "pure", False)
+        )
+
+        volatile_features: Set[str] = set()
+        stickiness_requirements: Dict[str, FrozenSet[StickinessRequirement]] = {}
+        for name in self.features:
+            volatile, requirements = self._analyze(name, set())
+            if volatile:
+                volatile_features.add(name)
+            elif requirements:
+                stickiness_requirements[name] = frozenset(requirements)
+
+        #: Feature toggles whose result can change between calls with an identical context.
+        self.volatile_features: FrozenSet[str] = frozenset(volatile_features)
+        #: Feature toggles that are only stable if the context has one of each set of stickiness fields.
+        self.stickiness_requirements = stickiness_requirements
+
+        constant_features = {}
+        for name, feature in self.features.items():
+            result = _constant_result(feature)
+            if result is not None:
+                constant_features[name] = result
+
+        #: Results of feature toggles that don't depend on the context.
+        self.constant_features: Dict[str, bool] = constant_features
+
+        compiled_features = {}
+        if compile_features:
+            for name, feature in self.features.items():
+                if name in constant_features:
+                    continue
+                evaluator = compile_feature(feature)
+                if evaluator is not None:
+                    compiled_features[name] = evaluator
+
+        #: Python evaluators for simple feature toggles, if compiling was enabled.
+        self.compiled_features: Dict[str, Evaluator] = compiled_features
+
+        #: Feature toggles that emit impression events.
+        self.impression_data_features: FrozenSet[str] = frozenset(
+            name
+            for name, feature in self.features.items()
+            if feature.get("impressionData")
+        )
+
+        #: Whether any feature toggle may read currentTime, either through a constraint or a custom strategy.
+        self.uses_current_time = any(
+            strategy.get("name") not in BUILTIN_STRATEGIES
+            or any(
+                constraint.get("contextName") == "currentTime"
+                for constraint in _strategy_constraints(strategy, self.segments)
+            )
+            for feature in self.features.values()
+            for strategy in feature.get("strategies") or []
+        )
+
+        #: Context fields read by any feature toggle, or None if that can't be determined.
+        self.context_fields = self._context_fields(custom_strategies)
+
+    @classmethod
+    def from_json(
+        cls,
+        state: str,
+        generation: int,
+        custom_strategies: Optional[dict] = None,
+        compile_features: bool = False,
+    ) -> "FeatureState":
+        provisioning = json.loads(state)
+        return cls(
+            generation,
+            provisioning.get("features"),
+            provisioning.get("segments"),
+            custom_strategies,
+            compile_features,
+        )
+
+    def _context_fields(self, custom_strategies: dict) -> Optional[FrozenSet[str]]:
+        fields: Set[str] = set()
+
+        def add_variant_fields(variants: List[dict]) -> None:
+            for variant in variants:
+                fields.update(
+                    _stickiness_requirement(
+                        variant.get("stickiness"), _DEFAULT_VARIANT_STICKINESS
+                    )
+                    or ()
+                )
+                for override in variant.get("overrides") or []:
+                    fields.add(override.get("contextName"))
+
+        for feature in self.features.values():
+            add_variant_fields(feature.get("variants") or [])
+
+            for strategy in feature.get("strategies") or []:
+                strategy_name = strategy.get("name")
+                parameters = strategy.get("parameters") or {}
+                if strategy_name not in BUILTIN_STRATEGIES:
+                    declared_fields = getattr(
+                        custom_strategies.get(strategy_name), "context_fields", None
+                    )
+                    if declared_fields is None:
+                        return None
+                    fields.update(declared_fields)
+                elif strategy_name == "flexibleRollout":
+                    fields.update(
+                        _stickiness_requirement(
+                            parameters.get("stickiness"), _DEFAULT_ROLLOUT_STICKINESS
+                        )
+                        or ()
+                    )
+                else:
+                    fields.update(_STRATEGY_CONTEXT_FIELDS.get(strategy_name, ()))
+
+                add_variant_fields(strategy.get("variants") or [])
+                for constraint in _strategy_constraints(strategy, self.segments):
+                    fields.add(constraint.get("contextName"))
+
+        return frozenset(fields)
+
+    def _analyze(
+        self, name: str, visited: Set[str]
+    ) -> Tuple[bool, Set[StickinessRequirement]]:
+        """
+        Returns (is_volatile, stickiness_requirements) for a feature toggle, including its parents.
+        """
+        feature = self.features.get(name)
+        if feature is None or name in visited:
+            return False, set()
+        visited.add(name)
+
+        requirements: Set[StickinessRequirement] = set()
+        volatile, requirement = _variants_requirement(feature.get("variants") or [])
+        if requirement:
+            requirements.add(requirement)
+
+        for strategy in feature.get("strategies") or []:
+            strategy_name = strategy.get("name")
+            if strategy_name == "gradualRolloutRandom":
+                volatile = True
+            elif (
+                strategy_name not in BUILTIN_STRATEGIES
+                and strategy_name not in self.pure_strategies
+            ):
+                volatile = True
+            elif strategy_name == "flexibleRollout":
+                rollout_volatile, requirement = _flexible_rollout_requirement(strategy)
+                volatile = volatile or rollout_volatile
+                if requirement:
+                    requirements.add(requirement)
+
+            variants_volatile, requirement = _variants_requirement(
+                strategy.get("variants") or []
+            )
+            volatile = volatile or variants_volatile
+            if requirement:
+                requirements.add(requirement)
+
+            if any(
+                constraint.get("contextName") == "currentTime"
+                for constraint in _strategy_constraints(strategy, self.segments)
+            ):
+                volatile = True
+
+        for dependency in feature.get("dependencies") or []:
+            parent_volatile, parent_requirements = self._analyze(
+                dependency.get("feature"), visited
+            )
+            volatile = volatile or parent_volatile
+            requirements.update(parent_requirements)
+
+        return volatile, requirements
+
+    def is_cacheable(self, feature_name: str, context: dict) -> bool:
+        """
+        Checks if evaluating a feature toggle with a context always gives the same result for as long as this state is loaded.
+
+        :param feature_name: Name of the feature
+        :param context: Normalized context.
+        :return: Whether the result can be cached.
+        """
+        if feature_name in self.volatile_features:
+            return False
+
+        requirements = self.stickiness_requirements.get(feature_name)
+        if requirements:
+            properties = context["properties"]
+            for fields in requirements:
+                if not any(field in context or field in properties for field in fields):
+                    return False
+
+        return True
@@ -0,0 +1,59 @@
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+
+
+class UnknownFlagCounter:
+    """
+    Counts lookups of feature flags that aren't loaded, and decides when each one should be logged.
+
+    Each flag is logged at most once per interval.  The number of lookups that would have been logged in between is reported with the next log message.
+
+    :param interval: Minimum number of seconds between log messages for the same flag.
+    """
+
+    def __init__(self, interval: float = 60.0) -> None:
+        self.interval = interval
+        self._lock = Lock()
+        # Feature name : [lookups, suppressed log messages, next time to log]
+        self._flags: Dict[str, List[float]] = {}
+
+    def record(self, feature_name: str, log: bool = True) -> Optional[int]:
+        """
+        Counts a lookup of an unknown flag.
+
+        :param feature_name: Name of the feature
+        :param log: Whether the lookup would be logged.  Lookups that wouldn't be are only counted, and don't affect when the flag is next logged.
+        :return: If the lookup should be logged, the number of log messages suppressed since the last time.  Otherwise None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._flags.get(feature_name)
+            if entry is None:
+                entry = self._flags[feature_name] = [0, 0, now]
+
+            entry[0] += 1
+            if not log:
+                return None
+            if now < entry[2]:
+                entry[1] += 1
+                return None
+
+            suppressed = int(entry[1])
+            entry[1] = 0
+            entry[2] = now + self.interval
+            return suppressed
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of lookups of each unknown flag.
+        """
+        with self._lock:
+            return {name: int(entry[0]) for name, entry in self._flags.items()}
+
+    def reset(self) -> None:
+        """
+        Forgets all counts, e.g. after exporting them.
+        """
+        with self._lock:
+            self._flags = {}
@@ -25,7 +25,8 @@ class InstanceCounter:
             return key in self.instances
 
     def _reset(self):
-        self.instances = {}
+        with self.lock:
+            self.instances = {}
 
     def count(self, key):
         with self.lock:
@@ -33,10 +34,7 @@ class InstanceCounter:
 
     def increment(self, key):
         with self.lock:
-            if key in self:
-                self.instances[key] += 1
-            else:
-                self.instances[key] = 1
+            self.instances[key] = self.instances.get(key, 0) + 1
 
 
 def normalized_hash(
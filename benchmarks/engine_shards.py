@@ -0,0 +1,111 @@
+"""
+Compares is_enabled() throughput across thread counts, with a single engine and with one engine per thread (``engine_shards``).
+
+Usage:
+
+    python benchmarks/engine_shards.py --threads 1,2,4,8 --seconds 2
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+
+from UnleashClient import ClientOptions, UnleashClient
+from UnleashClient.cache import FileCache
+from UnleashClient.utils import InstanceAllowType
+
+FEATURES = {
+    "version": 1,
+    "features": [
+        {
+            "name": "rolloutFlag",
+            "enabled": True,
+            "strategies": [
+                {
+                    "name": "flexibleRollout",
+                    "parameters": {
+                        "rollout": "50",
+                        "stickiness": "userId",
+                        "groupId": "rolloutFlag",
+                    },
+                    "constraints": [
+                        {
+                            "contextName": "environment",
+                            "operator": "IN",
+                            "values": ["default", "production"],
+                        }
+                    ],
+                }
+            ],
+        }
+    ],
+}
+
+
+def build_client(engine_shards: int, cache_directory: str) -> UnleashClient:
+    cache = FileCache("benchmark", directory=cache_directory)
+    cache.bootstrap_from_dict(FEATURES)
+    return UnleashClient(
+        "http://localhost:4242/api",
+        "benchmark",
+        disable_metrics=True,
+        disable_registration=True,
+        cache=cache,
+        options=ClientOptions(engine_shards=engine_shards),
+        multiple_instance_mode=InstanceAllowType.SILENTLY_ALLOW,
+    )
+
+
+def measure(client: UnleashClient, threads: int, seconds: float) -> float:
+    """
+    Returns the total number of is_enabled() calls per second across all threads.
+    """
+    counts = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+    stop = threading.Event()
+
+    def worker(index: int) -> None:
+        context = {"userId": str(index)}
+        calls = 0
+        barrier.wait()
+        while not stop.is_set():
+            for _ in range(100):
+                client.is_enabled("rolloutFlag", context)
+            calls += 100
+        counts[index] = calls
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for thread in workers:
+        thread.join()
+
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    thread_counts = [int(count) for count in args.threads.split(",")]
+
+    print(f"{'threads':>8} {'single engine':>16} {'sharded':>16} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as cache_directory:
+        for threads in thread_counts:
+            single = measure(build_client(1, cache_directory), threads, args.seconds)
+            sharded = measure(
+                build_client(threads, cache_directory), threads, args.seconds
+            )
+            print(
+                f"{threads:>8} {single:>14,.0f}/s {sharded:>14,.0f}/s {sharded / single:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
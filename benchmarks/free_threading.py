@@ -0,0 +1,45 @@
+"""
+Measures how is_enabled() throughput scales with thread count, e.g. to compare a free-threaded (no-GIL) CPython build with a regular one.
+
+Usage:
+
+    python3.13t benchmarks/free_threading.py --threads 1,2,4,8 --seconds 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from engine_shards import build_client, measure
+
+
+def gil_enabled() -> bool:
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled else True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default=f"1,2,4,{os.cpu_count() or 8}")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--engine-shards", type=int, default=1)
+    args = parser.parse_args()
+    thread_counts = [int(count) for count in args.threads.split(",")]
+
+    print(
+        f"Python {sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled'}, "
+        f"{os.cpu_count()} CPUs, {args.engine_shards} engine(s)"
+    )
+    print(f"{'threads':>8} {'calls':>16} {'scaling':>8}")
+    with tempfile.TemporaryDirectory() as cache_directory:
+        client = build_client(args.engine_shards, cache_directory)
+        baseline = None
+        for threads in thread_counts:
+            throughput = measure(client, threads, args.seconds)
+            baseline = baseline or throughput
+            print(f"{threads:>8} {throughput:>14,.0f}/s {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
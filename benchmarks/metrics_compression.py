@@ -0,0 +1,87 @@
+"""
+Compares the size of metrics request bodies, and the CPU time spent compressing them, for realistic bucket sizes.
+
+Usage:
+
+    python benchmarks/metrics_compression.py --flags 10,100,500,2000
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from UnleashClient.constants import CLIENT_SPEC_VERSION
+from UnleashClient.metrics import MetricsCounter
+
+COMPRESSION_LEVELS = (1, 6, 9)
+
+
+def build_request(flags: int, seed: int = 0) -> dict:
+    """
+    Builds a metrics request with the given number of feature flags, a third of which have variants.
+    """
+    rng = random.Random(seed)
+    counter = MetricsCounter()
+    for index in range(flags):
+        name = f"team-{index % 17}.feature-flag-{index}"
+        for _ in range(rng.randint(1, 50)):
+            counter.count_toggle(name, rng.random() < 0.5)
+        if index % 3 == 0:
+            for variant in range(rng.randint(2, 4)):
+                for _ in range(rng.randint(1, 20)):
+                    counter.count_variant(name, f"variant-{variant}")
+
+    return {
+        "appName": "benchmark",
+        "instanceId": "benchmark-7d9f8b6c5d-x2k4q",
+        "connectionId": "d7f5c6a2-0c1e-4b8a-9f5e-3a2b1c0d9e8f",
+        "bucket": counter.drain(),
+        "platformName": "CPython",
+        "platformVersion": "3.12.0",
+        "yggdrasilVersion": "0.17.0",
+        "specVersion": CLIENT_SPEC_VERSION,
+    }
+
+
+def measure(data: bytes, level: int, seconds: float) -> tuple:
+    """
+    Returns (compressed size in bytes, CPU seconds per compression).
+    """
+    compressed = gzip.compress(data, compresslevel=level)
+    iterations = 0
+    start = time.process_time()
+    deadline = start + seconds
+    while time.process_time() < deadline:
+        gzip.compress(data, compresslevel=level)
+        iterations += 1
+    return len(compressed), (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flags", default="10,100,500,2000")
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(
+        f"{'flags':>6} {'json bytes':>11} "
+        + " ".join(
+            f"{f'gzip-{level} bytes':>13} {'ratio':>6} {'us':>8}"
+            for level in COMPRESSION_LEVELS
+        )
+    )
+    for flags in (int(flags) for flags in args.flags.split(",")):
+        data = json.dumps(build_request(flags)).encode("utf-8")
+        columns = []
+        for level in COMPRESSION_LEVELS:
+            size, cpu_seconds = measure(data, level, args.seconds)
+            columns.append(
+                f"{size:>13} {size / len(data):>6.2f} {cpu_seconds * 1e6:>8.0f}"
+            )
+        print(f"{flags:>6} {len(data):>11} " + " ".join(columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ from os import path
 import pytest
 
 from tests.utilities.testing_constants import APP_NAME, URL
-from UnleashClient import UnleashClient
+from UnleashClient import ClientOptions, UnleashClient
 from UnleashClient.cache import FileCache
 
 CLIENT_SPEC_PATH = "tests/specification_tests/client-specification/specifications"
@@ -27,7 +27,7 @@ def load_specs():
         return json.load(_f)
 
 
-def get_client(state, test_context=None):
+def get_client(state, test_context=None, **options):
     cache = FileCache("MOCK_CACHE")
     cache.bootstrap_from_dict(state)
     env = "default"
@@ -42,6 +42,7 @@ def get_client(state, test_context=None):
         disable_registration=True,
         cache=cache,
         environment=env,
+        **options,
     )
 
     unleash_client.initialize_client(fetch_toggles=False)
@@ -93,3 +94,23 @@ def test_spec(spec):
         context = test_data.get("context")
         variant = unleash_client.get_variant(toggle_name, context)
         assert variant == expected
+
+
+@pytest.mark.parametrize("spec", TEST_DATA, ids=TEST_NAMES)
+def test_spec_compiled_features(spec):
+    unleash_client, test_data, is_variant_test = spec
+    if is_variant_test:
+        pytest.skip("Variants aren't compiled.")
+
+    verifying_client = get_client(
+        json.loads(unleash_client._loaded_state),
+        options=ClientOptions(verify_compiled_features=True),
+    )
+    toggle_name = test_data["toggleName"]
+    context = test_data.get("context")
+
+    assert (
+        verifying_client.is_enabled(toggle_name, context) == test_data["expectedResult"]
+    )
+    assert verifying_client.compiled_mismatches == 0
+    verifying_client.destroy()
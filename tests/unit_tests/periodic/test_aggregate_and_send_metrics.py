@@ -1,4 +1,6 @@
+import gzip
 import json
+import time
 
 import responses
 from yggdrasil_engine.engine import UnleashEngine
@@ -16,6 +18,8 @@ from UnleashClient.constants import (
     CLIENT_SPEC_VERSION,
     METRICS_URL,
 )
+from UnleashClient.metrics import MetricsCounter, MetricsSpool
+from UnleashClient.metrics_aggregator import MetricsAggregator
 from UnleashClient.periodic_tasks import aggregate_and_send_metrics
 
 FULL_METRICS_URL = URL + METRICS_URL
@@ -67,3 +71,158 @@ def test_metrics_metadata_is_sent():
     assert request["specVersion"] == CLIENT_SPEC_VERSION
     assert request["platformName"] is not None
     assert request["platformVersion"] is not None
+
+
+@responses.activate
+def test_metrics_counter_is_merged_into_bucket():
+    responses.add(responses.POST, FULL_METRICS_URL, json={}, status=200)
+
+    engine = UnleashEngine()
+    engine.count_toggle("testFlag", True)
+    metrics_counter = MetricsCounter()
+    metrics_counter.count_toggle("testFlag", False)
+    metrics_counter.count_variant("testVariations", "VarA")
+
+    aggregate_and_send_metrics(
+        URL,
+        APP_NAME,
+        INSTANCE_ID,
+        CONNECTION_ID,
+        CUSTOM_HEADERS,
+        CUSTOM_OPTIONS,
+        REQUEST_TIMEOUT,
+        engine,
+        metrics_counter,
+    )
+
+    assert len(responses.calls) == 1
+    toggles = json.loads(responses.calls[0].request.body)["bucket"]["toggles"]
+    assert toggles["testFlag"] == {"yes": 1, "no": 1, "variants": {}}
+    assert toggles["testVariations"]["variants"] == {"VarA": 1}
+    assert metrics_counter.drain() is None
+
+
+@responses.activate
+def test_metrics_are_compressed():
+    responses.add(responses.POST, FULL_METRICS_URL, json={}, status=200)
+
+    engine = UnleashEngine()
+    engine.count_toggle("testFlag", True)
+
+    aggregate_and_send_metrics(
+        URL,
+        APP_NAME,
+        INSTANCE_ID,
+        CONNECTION_ID,
+        CUSTOM_HEADERS,
+        CUSTOM_OPTIONS,
+        REQUEST_TIMEOUT,
+        engine,
+        compression_threshold=0,
+    )
+
+    request = responses.calls[0].request
+    assert request.headers["Content-Encoding"] == "gzip"
+    toggles = json.loads(gzip.decompress(request.body))["bucket"]["toggles"]
+    assert toggles["testFlag"]["yes"] == 1
+
+
+@responses.activate
+def test_failed_metrics_are_spooled():
+    responses.add(responses.POST, FULL_METRICS_URL, json={}, status=500)
+    responses.add(responses.POST, FULL_METRICS_URL, json={}, status=202)
+
+    engine = UnleashEngine()
+    metrics_spool = MetricsSpool()
+    for _ in range(2):
+        engine.count_toggle("testFlag", True)
+        aggregate_and_send_metrics(
+            URL,
+            APP_NAME,
+            INSTANCE_ID,
+            CONNECTION_ID,
+            CUSTOM_HEADERS,
+            CUSTOM_OPTIONS,
+            REQUEST_TIMEOUT,
+            engine,
+            metrics_spool=metrics_spool,
+        )
+
+    assert len(responses.calls) == 2
+    toggles = json.loads(responses.calls[1].request.body)["bucket"]["toggles"]
+    assert toggles["testFlag"]["yes"] == 2
+    assert metrics_spool.take() == (None, None)
+
+
+@responses.activate
+def test_metrics_are_sent_by_aggregator_leader(tmpdir):
+    responses.add(responses.POST, FULL_METRICS_URL, json={}, status=202)
+
+    socket_path = str(tmpdir.join("metrics.sock"))
+    leader = MetricsAggregator(socket_path)
+    leader.submit(None)
+    follower_engine = UnleashEngine()
+    follower_engine.count_toggle("testFlag", True)
+
+    aggregate_and_send_metrics(
+        URL,
+        APP_NAME,
+        INSTANCE_ID,
+        CONNECTION_ID,
+        CUSTOM_HEADERS,
+        CUSTOM_OPTIONS,
+        REQUEST_TIMEOUT,
+        follower_engine,
+        metrics_aggregator=MetricsAggregator(socket_path),
+    )
+    assert len(responses.calls) == 0
+
+    deadline = time.monotonic() + 2
+    while leader._received is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    leader_engine = UnleashEngine()
+    leader_engine.count_toggle("testFlag", True)
+    aggregate_and_send_metrics(
+        URL,
+        APP_NAME,
+        INSTANCE_ID,
+        CONNECTION_ID,
+        CUSTOM_HEADERS,
+        CUSTOM_OPTIONS,
+        REQUEST_TIMEOUT,
+        leader_engine,
+        metrics_aggregator=leader,
+    )
+    leader.close()
+
+    assert len(responses.calls) == 1
+    toggles = json.loads(responses.calls[0].request.body)["bucket"]["toggles"]
+    assert toggles["testFlag"]["yes"] == 2
+
+
+@responses.activate
+def test_spooled_metrics_expire_during_outage(mocker):
+    responses.add(responses.POST, FULL_METRICS_URL, json={}, status=500)
+    now = mocker.patch("UnleashClient.metrics.time.time", return_value=0)
+
+    engine = UnleashEngine()
+    metrics_spool = MetricsSpool(max_age=10)
+    for failed_at in (0, 8, 16, 24):
+        now.return_value = failed_at
+        engine.count_toggle("testFlag", True)
+        aggregate_and_send_metrics(
+            URL,
+            APP_NAME,
+            INSTANCE_ID,
+            CONNECTION_ID,
+            CUSTOM_HEADERS,
+            CUSTOM_OPTIONS,
+            REQUEST_TIMEOUT,
+            engine,
+            metrics_spool=metrics_spool,
+        )
+
+    # The bucket first spooled at 0 expired at 16, so only the counts from 16 and 24 remain.
+    bucket, spooled_at = metrics_spool.take()
+    assert spooled_at == 16
+    assert bucket["toggles"]["testFlag"]["yes"] == 2
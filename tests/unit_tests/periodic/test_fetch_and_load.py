@@ -1,3 +1,5 @@
+import json
+
 import responses
 from yggdrasil_engine.engine import UnleashEngine
 
@@ -52,6 +54,31 @@ def test_fetch_and_load(cache_empty):  # noqa: F811
     assert temp_cache.get(ETAG) == ETAG_VALUE
 
 
+@responses.activate
+def test_fetch_and_load_calls_state_callback(cache_empty):  # noqa: F811
+    engine = UnleashEngine()
+    responses.add(
+        responses.GET, FULL_FEATURE_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    loaded_states = []
+
+    fetch_and_load_features(
+        URL,
+        APP_NAME,
+        INSTANCE_ID,
+        CUSTOM_HEADERS,
+        CUSTOM_OPTIONS,
+        cache_empty,
+        REQUEST_TIMEOUT,
+        REQUEST_RETRIES,
+        engine,
+        state_callback=loaded_states.append,
+    )
+
+    assert len(loaded_states) == 1
+    assert json.loads(loaded_states[0])["features"][0]["name"] == "testFlag"
+
+
 @responses.activate
 def test_fetch_and_load_project(cache_empty):  # noqa: F811
     # Set up for tests
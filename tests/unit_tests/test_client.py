@@ -1,8 +1,13 @@
+import asyncio
+import gc
 import json
+import os
+import signal as os_signal
 import threading
 import time
 import uuid
 import warnings
+import weakref
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -21,6 +26,7 @@ from tests.utilities.mocks.mock_features import (
     MOCK_FEATURE_WITH_DATE_AFTER_CONSTRAINT,
     MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE,
     MOCK_FEATURE_WITH_NUMERIC_CONSTRAINT,
+    MOCK_FEATURE_WITH_PAYLOADS,
 )
 from tests.utilities.testing_constants import (
     APP_NAME,
@@ -41,10 +47,16 @@ from tests.utilities.testing_constants import (
     REQUEST_TIMEOUT,
     URL,
 )
-from UnleashClient import INSTANCES, UnleashClient
+from UnleashClient import (
+    INSTANCES,
+    ClientOptions,
+    UnleashClient,
+    build_ready_callback,
+)
 from UnleashClient.cache import FileCache
 from UnleashClient.constants import FEATURES_URL, METRICS_URL, REGISTER_URL
 from UnleashClient.events import BaseEvent, UnleashEvent, UnleashEventType
+from UnleashClient.loader import load_features
 from UnleashClient.utils import InstanceAllowType
 
 
@@ -497,6 +509,151 @@ def test_uc_context_manager(readyable_unleash_client_nodestroy):
     assert metrics_body["bucket"]["toggles"]["testFlag"]["yes"] == 1
 
 
+@responses.activate
+def test_uc_destroy_abandons_slow_metrics_flush(
+    readyable_unleash_client_nodestroy, mocker, caplog
+):
+    unleash_client, ready_signal, _ = readyable_unleash_client_nodestroy
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    send_metrics = mocker.patch(
+        "UnleashClient.aggregate_and_send_metrics",
+        side_effect=lambda **kwargs: time.sleep(2),
+    )
+
+    start = time.monotonic()
+    unleash_client.destroy(timeout=0.2)
+
+    assert time.monotonic() - start < 1
+    assert send_metrics.call_args.kwargs["request_timeout"] == 0.2
+    assert any("Abandoned flushing metrics" in r.getMessage() for r in caplog.records)
+
+
+@responses.activate
+def test_uc_destroy_on_exit(readyable_unleash_client_nodestroy, mocker):
+    unleash_client, ready_signal, _ = readyable_unleash_client_nodestroy
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    atexit = mocker.patch("UnleashClient.atexit")
+    destroy = mocker.spy(unleash_client, "destroy")
+
+    unleash_client.destroy_on_exit(timeout=1)
+    exit_hook = atexit.register.call_args.args[0]
+    exit_hook()
+    exit_hook()
+
+    destroy.assert_called_once_with(1)
+    atexit.unregister.assert_called_once_with(exit_hook)
+
+
+@responses.activate
+def test_uc_destroy_on_exit_flushes_without_thread(
+    readyable_unleash_client_nodestroy, mocker
+):
+    unleash_client, ready_signal, _ = readyable_unleash_client_nodestroy
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    atexit = mocker.patch("UnleashClient.atexit")
+    send_metrics = mocker.patch("UnleashClient.aggregate_and_send_metrics")
+    cache_destroy = mocker.spy(unleash_client.cache, "destroy")
+
+    unleash_client.destroy_on_exit(timeout=1)
+    exit_hook = atexit.register.call_args.args[0]
+    # Python 3.12+ doesn't start threads from atexit hooks.
+    mocker.patch(
+        "UnleashClient.threading.Thread.start",
+        side_effect=RuntimeError("can't create new thread at interpreter shutdown"),
+    )
+    exit_hook()
+
+    assert send_metrics.call_args.kwargs["request_timeout"] == 1
+    assert not unleash_client.unleash_scheduler.running
+    cache_destroy.assert_called_once()
+
+
+@responses.activate
+def test_uc_destroy_on_signal(readyable_unleash_client_nodestroy, mocker):
+    unleash_client, ready_signal, _ = readyable_unleash_client_nodestroy
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    mocker.patch("UnleashClient.atexit")
+    destroy = mocker.spy(unleash_client, "destroy")
+    previous_handler = mocker.Mock()
+    original_handler = os_signal.signal(os_signal.SIGUSR1, previous_handler)
+
+    try:
+        unleash_client.destroy_on_exit(timeout=1, signals=[os_signal.SIGUSR1])
+        os.kill(os.getpid(), os_signal.SIGUSR1)
+        time.sleep(0.1)
+    finally:
+        os_signal.signal(os_signal.SIGUSR1, original_handler)
+
+    destroy.assert_called_once_with(1)
+    previous_handler.assert_called_once()
+
+
+@responses.activate
+def test_uc_destroy_on_signal_without_python_handler(
+    readyable_unleash_client_nodestroy, mocker
+):
+    unleash_client, ready_signal, _ = readyable_unleash_client_nodestroy
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    mocker.patch("UnleashClient.atexit")
+    signal_module = mocker.patch("UnleashClient.signal")
+    # Handlers that weren't installed from Python are returned as None.
+    signal_module.getsignal.return_value = None
+    kill = mocker.patch("UnleashClient.os.kill")
+    destroy = mocker.spy(unleash_client, "destroy")
+
+    unleash_client.destroy_on_exit(timeout=1, signals=[os_signal.SIGUSR1])
+    signal_handler = signal_module.signal.call_args.args[1]
+    signal_handler(os_signal.SIGUSR1, None)
+
+    destroy.assert_called_once_with(1)
+    signal_module.signal.assert_called_with(os_signal.SIGUSR1, signal_module.SIG_DFL)
+    kill.assert_called_once_with(os.getpid(), os_signal.SIGUSR1)
+
+
+def test_uc_destroy_on_exit_does_not_keep_client_alive(mocker):
+    atexit = mocker.patch("UnleashClient.atexit")
+    unleash_client = UnleashClient(
+        URL, APP_NAME, disable_metrics=True, disable_registration=True
+    )
+    unleash_client.destroy_on_exit()
+    exit_hook = atexit.register.call_args.args[0]
+    client_ref = weakref.ref(unleash_client)
+
+    del unleash_client
+    gc.collect()
+
+    assert client_ref() is None
+    exit_hook()
+
+
 @responses.activate
 def test_uc_not_initialized_isenabled():
     unleash_client = UnleashClient(URL, APP_NAME)
@@ -533,9 +690,12 @@ def test_uc_get_variant():
     ready_signal.wait(timeout=1)
     # If feature flag is on.
     variant = unleash_client.get_variant("testVariations", context={"userId": "2"})
-    assert variant["name"] == "VarA"
-    assert variant["enabled"]
-    assert variant["feature_enabled"]
+    assert variant == {
+        "name": "VarA",
+        "payload": {"type": "string", "value": "Test1"},
+        "enabled": True,
+        "feature_enabled": True,
+    }
 
     # If feature flag is not.
     variant = unleash_client.get_variant("testVariations", context={"userId": "3"})
@@ -661,6 +821,30 @@ def test_uc_registers_variant_metrics_for_nonexistent_features(
     assert metrics["nonexistent-flag"]["variants"]["disabled"] == 1
 
 
+@responses.activate
+def test_uc_rate_limits_unknown_flag_logging(readyable_unleash_client, caplog):
+    unleash_client, ready_signal, _ = readyable_unleash_client
+    # Set up API
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+
+    # Create Unleash client and check initial load
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+
+    # is_enabled() doesn't log, so it mustn't keep get_variant() from logging.
+    for _ in range(5):
+        unleash_client.is_enabled("nonexistent-flag")
+        unleash_client.get_variant("nonexistent-flag")
+
+    messages = [r for r in caplog.records if "nonexistent-flag" in r.getMessage()]
+    assert len(messages) == 1
+    assert unleash_client.unknown_flags.counts() == {"nonexistent-flag": 10}
+    assert "testFlag" not in unleash_client.unknown_flags.counts()
+
+
 @responses.activate
 def test_uc_doesnt_count_metrics_for_dependency_parents(readyable_unleash_client):
     unleash_client, ready_signal, _ = readyable_unleash_client
@@ -722,173 +906,898 @@ def test_uc_counts_metrics_for_child_even_if_parent_is_disabled(
 
 
 @responses.activate
-def test_uc_disabled_registration(readyable_unleash_client_toggle_only):
-    unleash_client, ready_signal, _ = readyable_unleash_client_toggle_only
-    # Set up APIs
-    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=401)
+def test_uc_is_enabled_many(readyable_unleash_client):
+    unleash_client, ready_signal, _ = readyable_unleash_client
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
     responses.add(
         responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
     )
-    responses.add(responses.POST, URL + METRICS_URL, json={}, status=401)
 
     unleash_client.initialize_client()
-    unleash_client.is_enabled("testFlag")
     ready_signal.wait(timeout=1)
-    assert unleash_client.is_enabled("testFlag")
 
-    for api_call in responses.calls:
-        assert "/api/client/features" in api_call.request.url
+    results = unleash_client.is_enabled_many(
+        ["testFlag", "testVariations", "nonexistent-flag"], {"userId": "2"}
+    )
+
+    assert results == {
+        "testFlag": True,
+        "testVariations": True,
+        "nonexistent-flag": False,
+    }
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testFlag"]["yes"] == 1
+    assert metrics["testVariations"]["yes"] == 1
+    assert metrics["nonexistent-flag"]["no"] == 1
 
 
 @responses.activate
-def test_uc_server_error(readyable_unleash_client):
+def test_uc_get_variants_many(readyable_unleash_client):
     unleash_client, ready_signal, _ = readyable_unleash_client
-    # Verify that Unleash Client will still fall back gracefully if SERVER ANGRY RAWR, and then recover gracefully.
-    # Set up APIs
-    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=401)
-    responses.add(responses.GET, URL + FEATURES_URL, status=500)
-    responses.add(responses.POST, URL + METRICS_URL, json={}, status=401)
-
-    unleash_client.initialize_client()
-    assert not unleash_client.is_enabled("testFlag")
-
-    responses.remove(responses.GET, URL + FEATURES_URL)
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
     responses.add(
         responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
     )
-    ready_signal.wait(REFRESH_INTERVAL * 2)
-    assert unleash_client.is_enabled("testFlag")
 
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
 
-def test_uc_with_invalid_url():
-    unleash_client = UnleashClient("thisisnotavalidurl", APP_NAME)
+    variants = unleash_client.get_variants_many(
+        ["testVariations", "nonexistent-flag"], {"userId": "2"}
+    )
 
-    with pytest.raises(ValueError):
-        unleash_client.initialize_client()
+    assert variants["testVariations"]["name"] == "VarA"
+    assert variants["nonexistent-flag"]["name"] == "disabled"
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testVariations"]["variants"]["VarA"] == 1
+    assert metrics["nonexistent-flag"]["variants"]["disabled"] == 1
 
 
-def test_uc_with_network_error():
+def test_uc_samples_metrics(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
     unleash_client = UnleashClient(
-        "https://this-will-never-try-to-dns-resolve.invalid/",
+        URL,
         APP_NAME,
         disable_metrics=True,
+        cache=cache,
         disable_registration=True,
-        request_timeout=1,
-    )
-    unleash_client.initialize_client()
-
-    assert unleash_client.is_enabled
-
-
-@responses.activate
-def test_uc_multiple_initializations(readyable_unleash_client):
-    unleash_client, ready_signal, _ = readyable_unleash_client
-    # Set up API
-    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
-    responses.add(
-        responses.GET,
-        URL + FEATURES_URL,
-        json=MOCK_FEATURE_RESPONSE,
-        status=200,
-        headers={"etag": ETAG_VALUE},
+        options=ClientOptions(metrics_sample_rates={"testFlag": 0.5}),
     )
-    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
-
-    # Create Unleash client and check initial load
-    unleash_client.initialize_client()
-    ready_signal.wait(timeout=1)
-    assert unleash_client.is_initialized
-    assert len(unleash_client.feature_definitions()) >= 4
+    unleash_client.initialize_client(fetch_toggles=False)
+    mocker.patch("UnleashClient.metrics.random.random", side_effect=[0.7, 0.2, 0.9])
 
-    with warnings.catch_warnings(record=True) as w:
-        # Try and initialize client again.
-        unleash_client.initialize_client()
+    unleash_client.is_enabled("testFlag")
+    unleash_client.is_enabled("testFlag")
+    unleash_client.is_enabled("testVariations")
 
-    assert len(w) == 1
-    assert "initialize" in str(w[0].message)
+    assert unleash_client.metrics_sampler.sample_rate("testFlag") == 0.5
+    assert unleash_client.metrics_sampler.sample_rate("testVariations") == 1.0
+    bucket = unleash_client.metrics_sampler.scale(unleash_client.engine.get_metrics())
+    assert bucket["toggles"]["testFlag"]["yes"] == 2
+    assert "testVariations" in bucket["toggles"]
+    unleash_client.destroy()
 
 
-@responses.activate
-def test_uc_cache_bootstrap_dict(cache):
-    # Set up API
-    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
-    responses.add(
-        responses.GET,
-        URL + FEATURES_URL,
-        json=MOCK_FEATURE_RESPONSE,
-        status=200,
-        headers={"etag": ETAG_VALUE},
+def test_uc_evaluate_all(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
     )
-    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
+    unleash_client.initialize_client(fetch_toggles=False)
+    normalize_spy = mocker.spy(unleash_client, "_safe_context")
+
+    toggles = {
+        toggle["name"]: toggle
+        for toggle in unleash_client.evaluate_all({"userId": "2"})["toggles"]
+    }
+
+    assert normalize_spy.call_count == 1
+    assert set(toggles) == set(unleash_client.feature_definitions())
+    assert toggles["testFlag"] == {
+        "name": "testFlag",
+        "enabled": True,
+        "variant": {"name": "disabled", "enabled": False, "feature_enabled": True},
+        "impressionData": True,
+    }
+    assert toggles["testVariations"]["variant"]["name"] == "VarA"
+    assert toggles["testVariations"]["impressionData"] is True
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testVariations"]["variants"]["VarA"] == 1
+    unleash_client.destroy()
 
-    # Set up cache
-    cache.bootstrap_from_dict(initial_config=MOCK_FEATURE_RESPONSE_PROJECT)
-    event_handler, ready_signal, _ = build_event_handlers()
 
-    # Check bootstrapping
+def test_uc_evaluate_all_enabled_only():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
     unleash_client = UnleashClient(
         URL,
         APP_NAME,
-        refresh_interval=REFRESH_INTERVAL,
-        metrics_interval=METRICS_INTERVAL,
+        disable_metrics=True,
         cache=cache,
-        event_callback=event_handler,
+        disable_registration=True,
     )
-    assert len(unleash_client.feature_definitions()) == 1
-    assert unleash_client.is_enabled("ivan-project")
+    unleash_client.initialize_client(fetch_toggles=False)
 
-    # Create Unleash client and check initial load
-    unleash_client.initialize_client()
-    ready_signal.wait(timeout=1)
-    assert unleash_client.is_initialized
-    assert len(unleash_client.feature_definitions()) >= 4
-    assert unleash_client.is_enabled("testFlag")
+    toggles = unleash_client.evaluate_all({"userId": "3"}, enabled_only=True)["toggles"]
 
+    names = {toggle["name"] for toggle in toggles}
+    assert all(toggle["enabled"] for toggle in toggles)
+    assert "testFlag" in names
+    assert "testVariations" not in names
+    unleash_client.destroy()
 
-@responses.activate
-def test_uc_cache_bootstrap_file(cache):
-    # Set up cache
-    test_file = Path(
-        Path(__file__).parent.resolve(),
-        "..",
-        "utilities",
-        "mocks",
-        "mock_bootstrap.json",
-    )
-    cache.bootstrap_from_file(initial_config_file=test_file)
 
-    # Check bootstrapping
+def test_evaluate_stream_yields_chunks():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
     unleash_client = UnleashClient(
         URL,
         APP_NAME,
-        refresh_interval=REFRESH_INTERVAL,
-        metrics_interval=METRICS_INTERVAL,
+        disable_metrics=True,
         cache=cache,
+        disable_registration=True,
     )
-    assert len(unleash_client.feature_definitions()) >= 1
-    assert unleash_client.is_enabled("ivan-project")
 
-
-@responses.activate
-def test_uc_cache_bootstrap_url(cache):
-    # Set up API
-    responses.add(
-        responses.GET,
-        URL + FEATURES_URL,
-        json=MOCK_FEATURE_RESPONSE,
-        status=200,
-        headers={"etag": ETAG_VALUE},
+    contexts = ({"userId": str(user_id)} for user_id in range(5))
+    chunks = list(
+        unleash_client.evaluate_stream("testVariations", contexts, chunk_size=2)
     )
 
-    # Set up cache
-    cache.bootstrap_from_url(initial_config_url=URL + FEATURES_URL)
+    assert chunks == [[False, False], [True, False], [False]]
+    assert unleash_client.engine.get_metrics() is None
 
-    # Check bootstrapping
+
+def test_evaluate_stream_counts_metrics_when_asked():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
     unleash_client = UnleashClient(
         URL,
         APP_NAME,
-        refresh_interval=REFRESH_INTERVAL,
-        metrics_interval=METRICS_INTERVAL,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+
+    contexts = [{"userId": "2"}, unleash_client.build_context({"userId": "3"})]
+    results = list(
+        unleash_client.evaluate_stream("testVariations", contexts, count_metrics=True)
+    )
+
+    assert results == [[True, False]]
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testVariations"]["yes"] == 1
+    assert metrics["testVariations"]["no"] == 1
+
+
+@responses.activate
+def test_uc_scope_memoizes_results(readyable_unleash_client):
+    unleash_client, ready_signal, _ = readyable_unleash_client
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+
+    with unleash_client.scope({"userId": "2"}) as flags:
+        assert flags.is_enabled("testVariations")
+        assert flags.is_enabled("testVariations")
+        assert flags.get_variant("testVariations")["name"] == "VarA"
+        assert flags.get_variant("testVariations")["name"] == "VarA"
+
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testVariations"]["yes"] == 1
+    assert metrics["testVariations"]["variants"]["VarA"] == 1
+
+
+def test_uc_scope_memoized_results_are_kept_across_state_changes():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+    generation = unleash_client.state_generation
+
+    with unleash_client.scope() as flags:
+        assert flags.is_enabled("testFlag")
+
+        cache.bootstrap_from_dict(MOCK_ALL_FEATURES)
+        load_features(
+            cache, unleash_client.engine, state_callback=unleash_client._on_state_loaded
+        )
+
+        assert flags.is_enabled("testFlag")
+        assert unleash_client.state_generation == generation + 1
+
+
+def test_uc_flag_handle(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+    engine_is_enabled = mocker.spy(unleash_client.engine, "is_enabled")
+    test_flag = unleash_client.flag("testFlag")
+    variations = unleash_client.flag("testVariations")
+
+    assert test_flag.exists
+    assert test_flag.impression_data
+    assert test_flag.enabled({"userId": "2"})
+    assert engine_is_enabled.call_count == 0
+    assert variations.enabled({"userId": "2"})
+    assert variations.variant({"userId": "2"})["name"] == "VarA"
+    assert not unleash_client.flag("missingFlag").exists
+    assert unleash_client.flag("missingFlag").enabled(
+        fallback_function=lambda feature_name, context: True
+    )
+
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testFlag"]["yes"] == 1
+    assert metrics["testVariations"]["yes"] == 2
+
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE)
+    load_features(
+        cache, unleash_client.engine, state_callback=unleash_client._on_state_loaded
+    )
+
+    assert not variations.exists
+    assert not variations.enabled({"userId": "2"})
+
+
+def test_uc_pinned_flag(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+
+    variations = unleash_client.pin("testVariations", {"userId": "2"})
+    missing = unleash_client.pin(
+        "missingFlag", fallback_function=lambda feature_name, context: True
+    )
+    engine_is_enabled = mocker.spy(unleash_client.engine, "is_enabled")
+
+    assert variations.enabled
+    assert variations.enabled
+    assert missing.enabled
+    assert engine_is_enabled.call_count == 0
+    assert unleash_client.engine.get_metrics()["toggles"]["testVariations"]["yes"] == 2
+
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE)
+    load_features(
+        cache, unleash_client.engine, state_callback=unleash_client._on_state_loaded
+    )
+
+    assert not variations.enabled
+    assert engine_is_enabled.call_count == 2
+
+    unleash_client.unpin(variations)
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    load_features(
+        cache, unleash_client.engine, state_callback=unleash_client._on_state_loaded
+    )
+
+    assert engine_is_enabled.call_count == 3
+    assert not variations.enabled
+
+
+@responses.activate
+def test_uc_callbacks_cannot_modify_ambient_or_pinned_context():
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    event_handler, ready_signal, _ = build_event_handlers()
+
+    def modify_context(feature_name, context):
+        context["userId"] = "modified"
+        context["properties"]["tier"] = "modified"
+        return True
+
+    def modify_event(event):
+        event_handler(event)
+        if event.event_type == UnleashEventType.FEATURE_FLAG:
+            modify_context(event.feature_name, event.context)
+
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        event_callback=modify_event,
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+
+    with unleash_client.ambient_context({"userId": "2", "tier": "gold"}):
+        assert unleash_client.is_enabled("testFlag")
+        assert unleash_client.is_enabled(
+            "notFoundTestFlag", fallback_function=modify_context
+        )
+        context = unleash_client._safe_context(None)
+        assert context["userId"] == "2"
+        assert context["properties"]["tier"] == "gold"
+
+    pinned = unleash_client.pin("testFlag", {"userId": "2", "tier": "gold"})
+    assert pinned.enabled
+    missing = unleash_client.pin(
+        "notFoundTestFlag", {"userId": "2"}, fallback_function=modify_context
+    )
+    assert missing.enabled
+
+    assert pinned.context["userId"] == "2"
+    assert pinned.context["properties"]["tier"] == "gold"
+    assert missing.context["userId"] == "2"
+    with pytest.raises(TypeError):
+        pinned.context["properties"]["tier"] = "silver"  # type: ignore
+
+    unleash_client.destroy()
+
+
+def test_uc_ambient_context():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+
+    with unleash_client.ambient_context({"userId": "2"}):
+        assert unleash_client.is_enabled("testVariations")
+        assert unleash_client.get_variant("testVariations")["name"] == "VarA"
+        assert not unleash_client.is_enabled("testVariations", {"userId": "3"})
+
+        with unleash_client.ambient_context({"tier": "gold"}):
+            context = unleash_client._safe_context({"region": "eu"})
+            assert context["userId"] == "2"
+            assert context["appName"] == APP_NAME
+            assert context["properties"] == {"tier": "gold", "region": "eu"}
+
+        other_thread_contexts = []
+        thread = threading.Thread(
+            target=lambda: other_thread_contexts.append(
+                unleash_client._safe_context(None)
+            )
+        )
+        thread.start()
+        thread.join()
+        assert "userId" not in other_thread_contexts[0]
+
+    assert "userId" not in unleash_client._safe_context(None)
+
+    async def check(user_id):
+        with unleash_client.ambient_context({"userId": user_id}):
+            await asyncio.sleep(0)
+            return unleash_client.is_enabled("testVariations")
+
+    async def check_all():
+        return await asyncio.gather(check("2"), check("3"))
+
+    assert asyncio.run(check_all()) == [True, False]
+
+
+def test_uc_typed_payloads():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_PAYLOADS)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+    config = unleash_client.get_json_payload("jsonPayload")
+
+    assert config == {"limits": (1, 2), "mode": "fast"}
+    assert unleash_client.get_json_payload("jsonPayload") is config
+    assert len(unleash_client.payload_cache) == 1
+    assert unleash_client.get_number_payload("numberPayload") == 42
+    assert unleash_client.get_string_payload("numberPayload", default="none") == "none"
+    assert unleash_client.get_json_payload("missingFlag", default={}) == {}
+    assert unleash_client.flag("jsonPayload").json_payload() is config
+    assert unleash_client.flag("numberPayload").number_payload() == 42
+    assert unleash_client.flag("numberPayload").string_payload(default="") == ""
+    assert (
+        unleash_client.engine.get_metrics()["toggles"]["jsonPayload"]["variants"][
+            "config"
+        ]
+        == 3
+    )
+
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    load_features(
+        cache, unleash_client.engine, state_callback=unleash_client._on_state_loaded
+    )
+
+    assert len(unleash_client.payload_cache) == 0
+
+
+def test_uc_compiled_features(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+        options=ClientOptions(compile_features=True),
+    )
+    engine_is_enabled = mocker.spy(unleash_client.engine, "is_enabled")
+
+    assert unleash_client.is_enabled("testVariations", {"userId": "2"})
+    assert not unleash_client.is_enabled("testVariations", {"userId": "3"})
+    assert engine_is_enabled.call_count == 0
+    assert unleash_client.engine.get_metrics()["toggles"]["testVariations"] == {
+        "yes": 1,
+        "no": 1,
+        "variants": {},
+    }
+
+
+def test_uc_verify_compiled_features(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_ALL_FEATURES)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+        options=ClientOptions(verify_compiled_features=True),
+    )
+    engine_is_enabled = mocker.spy(unleash_client.engine, "is_enabled")
+
+    for user_id in range(10):
+        context = {"userId": str(user_id), "environment": "prod"}
+        unleash_client.is_enabled("UserWithId", context)
+        unleash_client.is_enabled("FlexibleRollout", context)
+
+    assert engine_is_enabled.call_count == 20
+    assert unleash_client.compiled_mismatches == 0
+
+
+def test_uc_result_cache(mocker):
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+        options=ClientOptions(result_cache_size=100),
+    )
+    engine_is_enabled = mocker.spy(unleash_client.engine, "is_enabled")
+
+    for _ in range(3):
+        assert unleash_client.is_enabled("testVariations", {"userId": "2"})
+        unleash_client.is_enabled("testFlag2", {"userId": "2"})
+
+    assert unleash_client.result_cache.stats()["hits"] == 2
+    assert engine_is_enabled.call_count == 4
+    assert unleash_client.engine.get_metrics()["toggles"]["testVariations"]["yes"] == 3
+
+    cache.bootstrap_from_dict(MOCK_ALL_FEATURES)
+    load_features(
+        cache, unleash_client.engine, state_callback=unleash_client._on_state_loaded
+    )
+
+    assert len(unleash_client.result_cache) == 0
+
+
+def test_uc_result_cache_hands_out_copies_of_variants():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+        options=ClientOptions(result_cache_size=100),
+    )
+
+    variant = unleash_client.get_variant("testVariations", {"userId": "2"})
+    variant["payload"]["value"] = "changed"
+
+    variant = unleash_client.get_variant("testVariations", {"userId": "2"})
+    assert unleash_client.result_cache.stats()["hits"] == 1
+    assert variant["payload"] == {"type": "string", "value": "Test1"}
+
+
+@responses.activate
+def test_uc_constant_features_skip_engine(mocker):
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    event_handler, ready_signal, _ = build_event_handlers()
+    events = []
+
+    def capture_event(event):
+        events.append(event)
+        event_handler(event)
+
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        event_callback=capture_event,
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    engine_is_enabled = mocker.spy(unleash_client.engine, "is_enabled")
+    should_emit_impression_event = mocker.spy(
+        unleash_client.engine, "should_emit_impression_event"
+    )
+
+    assert unleash_client.is_enabled("testFlag", {"userId": "2"})
+
+    assert engine_is_enabled.call_count == 0
+    assert should_emit_impression_event.call_count == 0
+    assert "testFlag" in unleash_client.impression_data_features
+    assert unleash_client.engine.get_metrics()["toggles"]["testFlag"]["yes"] == 1
+    flag_events = [e for e in events if e.event_type == UnleashEventType.FEATURE_FLAG]
+    assert flag_events[0].context["userId"] == "2"
+
+    unleash_client.destroy()
+
+
+@responses.activate
+def test_uc_callbacks_cannot_modify_built_context():
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    event_handler, ready_signal, _ = build_event_handlers()
+
+    def modify_context(feature_name, context):
+        context["userId"] = "modified"
+        context["properties"]["tier"] = "modified"
+        return True
+
+    def modify_event(event):
+        event_handler(event)
+        if event.event_type == UnleashEventType.FEATURE_FLAG:
+            modify_context(event.feature_name, event.context)
+
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        event_callback=modify_event,
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    context = unleash_client.build_context({"userId": "2", "tier": "gold"})
+
+    assert unleash_client.is_enabled("testFlag", context)
+    assert unleash_client.is_enabled(
+        "notFoundTestFlag", context, fallback_function=modify_context
+    )
+
+    assert context["userId"] == "2"
+    assert context["properties"]["tier"] == "gold"
+
+    unleash_client.destroy()
+
+
+@responses.activate
+def test_uc_buffer_metrics_skips_engine_counting(mocker):
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    event_handler, ready_signal, _ = build_event_handlers()
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        event_callback=event_handler,
+        options=ClientOptions(buffer_metrics=True),
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    count_toggle = mocker.spy(unleash_client.engine, "count_toggle")
+    count_variant = mocker.spy(unleash_client.engine, "count_variant")
+
+    assert unleash_client.is_enabled("testFlag")
+    assert unleash_client.is_enabled("testConstraintFlag", {"userId": "1"}) is False
+    unleash_client.get_variant("testVariations", context={"userId": "2"})
+
+    assert count_toggle.call_count == 0
+    assert count_variant.call_count == 0
+    toggles = unleash_client.metrics_counter.drain()["toggles"]
+    assert toggles["testFlag"]["yes"] == 1
+    assert toggles["testVariations"] == {"yes": 1, "no": 0, "variants": {"VarA": 1}}
+
+    unleash_client.destroy()
+
+
+@responses.activate
+def test_uc_engine_shards():
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    event_handler, ready_signal, _ = build_event_handlers()
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        event_callback=event_handler,
+        options=ClientOptions(engine_shards=2),
+    )
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+
+    def evaluate():
+        assert unleash_client.is_enabled("testVariations", {"userId": "2"})
+
+    threads = [threading.Thread(target=evaluate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(unleash_client.engine.shards) == 2
+    metrics = unleash_client.engine.get_metrics()["toggles"]
+    assert metrics["testVariations"]["yes"] == 4
+
+    unleash_client.destroy()
+
+
+def test_ready_callback_fires_once_across_threads():
+    events = []
+    ready_callback = build_ready_callback(events.append)
+    barrier = threading.Barrier(8)
+
+    def fire():
+        barrier.wait()
+        ready_callback()
+
+    threads = [threading.Thread(target=fire) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(events) == 1
+
+
+def test_uc_concurrent_loads_and_evaluations():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+    errors = []
+
+    def load():
+        try:
+            for features in (MOCK_ALL_FEATURES, MOCK_FEATURE_RESPONSE) * 10:
+                cache.bootstrap_from_dict(features)
+                load_features(
+                    cache,
+                    unleash_client.engine,
+                    state_callback=unleash_client._on_state_loaded,
+                )
+        except Exception as excep:  # pylint: disable=broad-except
+            errors.append(excep)
+
+    def evaluate():
+        try:
+            for _ in range(200):
+                unleash_client.is_enabled("testFlag", {"userId": "2"})
+                unleash_client.get_variant("testVariations", {"userId": "2"})
+        except Exception as excep:  # pylint: disable=broad-except
+            errors.append(excep)
+
+    threads = [threading.Thread(target=load) for _ in range(2)]
+    threads += [threading.Thread(target=evaluate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert unleash_client.state_generation > 1
+
+
+@responses.activate
+def test_uc_disabled_registration(readyable_unleash_client_toggle_only):
+    unleash_client, ready_signal, _ = readyable_unleash_client_toggle_only
+    # Set up APIs
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=401)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=401)
+
+    unleash_client.initialize_client()
+    unleash_client.is_enabled("testFlag")
+    ready_signal.wait(timeout=1)
+    assert unleash_client.is_enabled("testFlag")
+
+    for api_call in responses.calls:
+        assert "/api/client/features" in api_call.request.url
+
+
+@responses.activate
+def test_uc_server_error(readyable_unleash_client):
+    unleash_client, ready_signal, _ = readyable_unleash_client
+    # Verify that Unleash Client will still fall back gracefully if SERVER ANGRY RAWR, and then recover gracefully.
+    # Set up APIs
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=401)
+    responses.add(responses.GET, URL + FEATURES_URL, status=500)
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=401)
+
+    unleash_client.initialize_client()
+    assert not unleash_client.is_enabled("testFlag")
+
+    responses.remove(responses.GET, URL + FEATURES_URL)
+    responses.add(
+        responses.GET, URL + FEATURES_URL, json=MOCK_FEATURE_RESPONSE, status=200
+    )
+    ready_signal.wait(REFRESH_INTERVAL * 2)
+    assert unleash_client.is_enabled("testFlag")
+
+
+def test_uc_with_invalid_url():
+    unleash_client = UnleashClient("thisisnotavalidurl", APP_NAME)
+
+    with pytest.raises(ValueError):
+        unleash_client.initialize_client()
+
+
+def test_uc_with_network_error():
+    unleash_client = UnleashClient(
+        "https://this-will-never-try-to-dns-resolve.invalid/",
+        APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        request_timeout=1,
+    )
+    unleash_client.initialize_client()
+
+    assert unleash_client.is_enabled
+
+
+@responses.activate
+def test_uc_multiple_initializations(readyable_unleash_client):
+    unleash_client, ready_signal, _ = readyable_unleash_client
+    # Set up API
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET,
+        URL + FEATURES_URL,
+        json=MOCK_FEATURE_RESPONSE,
+        status=200,
+        headers={"etag": ETAG_VALUE},
+    )
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
+
+    # Create Unleash client and check initial load
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    assert unleash_client.is_initialized
+    assert len(unleash_client.feature_definitions()) >= 4
+
+    with warnings.catch_warnings(record=True) as w:
+        # Try and initialize client again.
+        unleash_client.initialize_client()
+
+    assert len(w) == 1
+    assert "initialize" in str(w[0].message)
+
+
+@responses.activate
+def test_uc_cache_bootstrap_dict(cache):
+    # Set up API
+    responses.add(responses.POST, URL + REGISTER_URL, json={}, status=202)
+    responses.add(
+        responses.GET,
+        URL + FEATURES_URL,
+        json=MOCK_FEATURE_RESPONSE,
+        status=200,
+        headers={"etag": ETAG_VALUE},
+    )
+    responses.add(responses.POST, URL + METRICS_URL, json={}, status=202)
+
+    # Set up cache
+    cache.bootstrap_from_dict(initial_config=MOCK_FEATURE_RESPONSE_PROJECT)
+    event_handler, ready_signal, _ = build_event_handlers()
+
+    # Check bootstrapping
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        refresh_interval=REFRESH_INTERVAL,
+        metrics_interval=METRICS_INTERVAL,
+        cache=cache,
+        event_callback=event_handler,
+    )
+    assert len(unleash_client.feature_definitions()) == 1
+    assert unleash_client.is_enabled("ivan-project")
+
+    # Create Unleash client and check initial load
+    unleash_client.initialize_client()
+    ready_signal.wait(timeout=1)
+    assert unleash_client.is_initialized
+    assert len(unleash_client.feature_definitions()) >= 4
+    assert unleash_client.is_enabled("testFlag")
+
+
+@responses.activate
+def test_uc_cache_bootstrap_file(cache):
+    # Set up cache
+    test_file = Path(
+        Path(__file__).parent.resolve(),
+        "..",
+        "utilities",
+        "mocks",
+        "mock_bootstrap.json",
+    )
+    cache.bootstrap_from_file(initial_config_file=test_file)
+
+    # Check bootstrapping
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        refresh_interval=REFRESH_INTERVAL,
+        metrics_interval=METRICS_INTERVAL,
+        cache=cache,
+    )
+    assert len(unleash_client.feature_definitions()) >= 1
+    assert unleash_client.is_enabled("ivan-project")
+
+
+@responses.activate
+def test_uc_cache_bootstrap_url(cache):
+    # Set up API
+    responses.add(
+        responses.GET,
+        URL + FEATURES_URL,
+        json=MOCK_FEATURE_RESPONSE,
+        status=200,
+        headers={"etag": ETAG_VALUE},
+    )
+
+    # Set up cache
+    cache.bootstrap_from_url(initial_config_url=URL + FEATURES_URL)
+
+    # Check bootstrapping
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        refresh_interval=REFRESH_INTERVAL,
+        metrics_interval=METRICS_INTERVAL,
         cache=cache,
     )
     assert len(unleash_client.feature_definitions()) >= 4
@@ -1224,6 +2133,60 @@ def test_context_adds_current_time_if_not_set():
     assert unleash_client.is_enabled("DateConstraint")
 
 
+def test_prebuilt_context_leaves_current_time_to_engine():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_DATE_AFTER_CONSTRAINT)
+
+    unleash_client = UnleashClient(
+        url=URL,
+        app_name=APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        cache=cache,
+        environment="default",
+    )
+
+    context = unleash_client.build_context({"userId": "2"})
+
+    assert "currentTime" not in context
+    assert unleash_client.is_enabled("DateConstraint", context)
+
+
+def test_context_skips_current_time_if_no_feature_uses_it():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE)
+
+    unleash_client = UnleashClient(
+        url=URL,
+        app_name=APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        cache=cache,
+    )
+
+    assert "currentTime" not in unleash_client._safe_context({})
+
+
+def test_context_uses_coarse_clock_for_current_time():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_DATE_AFTER_CONSTRAINT)
+
+    unleash_client = UnleashClient(
+        url=URL,
+        app_name=APP_NAME,
+        disable_metrics=True,
+        disable_registration=True,
+        cache=cache,
+        options=ClientOptions(current_time_resolution_ms=60000),
+    )
+
+    first_context = unleash_client._safe_context({})
+    assert (
+        first_context["currentTime"] is unleash_client._safe_context({})["currentTime"]
+    )
+    assert unleash_client.is_enabled("DateConstraint")
+
+
 def test_context_moves_properties_fields_to_properties():
     unleash_client = UnleashClient(
         URL,
@@ -1279,6 +2242,46 @@ def test_is_enabled_works_with_properties_field_in_the_context_root():
     assert unleash_client.is_enabled("customContextToggle", context)
 
 
+def test_context_is_pruned_to_referenced_fields():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_WITH_CUSTOM_CONTEXT_REQUIREMENTS)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+        options=ClientOptions(prune_context=True),
+    )
+
+    context = {"userId": "2", "myContext": "1234", "unusedContext": "abcd"}
+    safe_context = unleash_client._safe_context(context)
+
+    assert safe_context["userId"] == "2"
+    assert safe_context["properties"] == {"myContext": "1234"}
+    assert unleash_client.is_enabled("customContextToggle", context)
+    assert "unusedContext" in unleash_client.build_context(context)["properties"]
+
+
+def test_is_enabled_accepts_prebuilt_context():
+    cache = FileCache("MOCK_CACHE")
+    cache.bootstrap_from_dict(MOCK_FEATURE_RESPONSE)
+    unleash_client = UnleashClient(
+        URL,
+        APP_NAME,
+        disable_metrics=True,
+        cache=cache,
+        disable_registration=True,
+    )
+
+    context = unleash_client.build_context({"userId": "2"})
+
+    assert context["appName"] == APP_NAME
+    assert unleash_client._safe_context(context) is context._fields
+    assert unleash_client.is_enabled("testVariations", context)
+    assert unleash_client.get_variant("testVariations", context)["name"] == "VarA"
+
+
 def test_uuids_are_valid_context_properties():
     unleash_client = UnleashClient(
         URL,
@@ -0,0 +1,158 @@
+import json
+import random
+
+import pytest
+from yggdrasil_engine.engine import UnleashEngine
+
+from tests.utilities.mocks.mock_all_features import MOCK_ALL_FEATURES
+from UnleashClient.compiled import compile_feature
+from UnleashClient.context import normalize_context
+
+VALUES = ["a", "b", "1", "2", "3"]
+
+
+def random_strategy(rng):
+    constraints = [
+        {
+            "contextName": rng.choice(["userId", "environment", "tier", "appName"]),
+            "operator": rng.choice(["IN", "NOT_IN"]),
+            "values": rng.sample(VALUES, rng.randint(0, 3)),
+            "inverted": rng.random() < 0.3,
+        }
+        for _ in range(rng.randint(0, 2))
+    ]
+    name = rng.choice(["default", "userWithId", "flexibleRollout"])
+    parameters = {}
+    if name == "userWithId":
+        parameters = {"userIds": ", ".join(rng.sample(VALUES, 2))}
+    elif name == "flexibleRollout":
+        parameters = {
+            "rollout": str(rng.choice([0, 10, 50, 90, 100])),
+            "stickiness": rng.choice(["default", "userId", "sessionId", "tier"]),
+            "groupId": "group",
+        }
+    return {"name": name, "parameters": parameters, "constraints": constraints}
+
+
+def random_context(rng):
+    context = {
+        field: rng.choice(VALUES)
+        for field in ("userId", "sessionId", "tier", "environment")
+        if rng.random() < 0.6
+    }
+    # Standard fields can also be passed in properties.
+    properties = {
+        field: context.pop(field)
+        for field in ("userId", "sessionId")
+        if field in context and rng.random() < 0.3
+    }
+    context["properties"] = properties
+    return normalize_context(context, {"appName": "a"}, current_time=None)
+
+
+def test_compiled_features_agree_with_engine():
+    rng = random.Random(42)
+    compared = 0
+
+    for index in range(100):
+        feature = {
+            "name": f"feature{index}",
+            "enabled": True,
+            "strategies": [random_strategy(rng) for _ in range(rng.randint(1, 3))],
+        }
+        engine = UnleashEngine()
+        engine.take_state(json.dumps({"version": 1, "features": [feature]}))
+        evaluate = compile_feature(feature)
+        assert evaluate is not None
+
+        for _ in range(20):
+            context = random_context(rng)
+            result = evaluate(context)
+            if result is not None:
+                assert result == engine.is_enabled(feature["name"], context)
+                compared += 1
+
+    assert compared > 1500
+
+
+def test_only_simple_features_are_compiled():
+    features = {feature["name"]: feature for feature in MOCK_ALL_FEATURES["features"]}
+
+    assert compile_feature(features["UserWithId"]) is not None
+    assert compile_feature(features["FlexibleRollout"]) is not None
+    assert compile_feature(features["GradualRolloutRandom"]) is None
+    assert compile_feature(features["RemoteAddress"]) is None
+    assert compile_feature(features["Garbage"]) is None
+
+
+def test_random_stickiness_is_left_to_engine():
+    evaluate = compile_feature(
+        {
+            "name": "rollout",
+            "enabled": True,
+            "strategies": [
+                {"name": "flexibleRollout", "parameters": {"rollout": "50"}}
+            ],
+        }
+    )
+
+    assert evaluate(normalize_context({}, current_time=None)) is None
+    assert evaluate(normalize_context({"userId": "1"}, current_time=None)) in (
+        True,
+        False,
+    )
+
+
+@pytest.mark.parametrize(
+    "rollout", ["", " 50", "50 ", "+50", "50.0", "101", "1000", 50, None]
+)
+def test_unusual_rollouts_are_not_compiled(rollout):
+    assert (
+        compile_feature(
+            {
+                "name": "rollout",
+                "enabled": True,
+                "strategies": [
+                    {
+                        "name": "flexibleRollout",
+                        "parameters": {"rollout": rollout, "stickiness": "userId"},
+                    }
+                ],
+            }
+        )
+        is None
+    )
+
+
+def test_empty_group_id_agrees_with_engine():
+    feature = {
+        "name": "rollout",
+        "enabled": True,
+        "strategies": [
+            {
+                "name": "flexibleRollout",
+                "parameters": {"rollout": "50", "stickiness": "userId", "groupId": ""},
+            }
+        ],
+    }
+    engine = UnleashEngine()
+    engine.take_state(json.dumps({"version": 1, "features": [feature]}))
+    evaluate = compile_feature(feature)
+
+    for user_id in range(50):
+        context = normalize_context({"userId": str(user_id)}, current_time=None)
+        assert evaluate(context) == engine.is_enabled("rollout", context)
+
+
+def test_standard_fields_are_read_from_properties():
+    feature = {
+        "name": "userWithId",
+        "enabled": True,
+        "strategies": [{"name": "userWithId", "parameters": {"userIds": "1"}}],
+    }
+    engine = UnleashEngine()
+    engine.take_state(json.dumps({"version": 1, "features": [feature]}))
+    context = normalize_context({"properties": {"userId": "1"}}, current_time=None)
+
+    assert compile_feature(feature)(context) is True
+    assert engine.is_enabled("userWithId", context) is True
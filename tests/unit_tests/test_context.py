@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from UnleashClient.context import (
+    CoarseClock,
+    UnleashContext,
+    merge_context,
+    normalize_context,
+)
+
+STATIC_CONTEXT = {"appName": "pytest", "environment": "default"}
+
+
+def test_normalize_context_stringifies_values():
+    context = normalize_context(
+        {"userId": 1234, "currentTime": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+        STATIC_CONTEXT,
+    )
+
+    assert context["userId"] == "1234"
+    assert context["currentTime"] == "2024-01-01T00:00:00+00:00"
+    assert context["appName"] == "pytest"
+
+
+def test_normalize_context_moves_custom_fields_to_properties():
+    context = normalize_context(
+        {"myContext": "1234", "properties": {"yourContext": 5}}, STATIC_CONTEXT
+    )
+
+    assert context["properties"] == {"myContext": "1234", "yourContext": "5"}
+
+
+def test_normalize_context_can_skip_current_time():
+    context = normalize_context({"userId": "1234"}, STATIC_CONTEXT, current_time=None)
+
+    assert "currentTime" not in context
+
+
+def test_normalize_context_drops_unused_custom_fields():
+    context = normalize_context(
+        {"userId": "1234", "tier": "gold", "properties": {"region": "eu", "os": "ios"}},
+        STATIC_CONTEXT,
+        fields=frozenset(["region"]),
+    )
+
+    assert context["userId"] == "1234"
+    assert context["appName"] == "pytest"
+    assert context["properties"] == {"region": "eu"}
+
+
+def test_merge_context_normalizes_only_supplied_fields():
+    base = normalize_context(
+        {"userId": "1234", "tier": "gold"}, STATIC_CONTEXT, current_time=None
+    )
+
+    context = merge_context(
+        base, {"sessionId": 5, "region": "eu"}, current_time=lambda: "now"
+    )
+
+    assert context["userId"] == "1234"
+    assert context["sessionId"] == "5"
+    assert context["currentTime"] == "now"
+    assert context["properties"] == {"tier": "gold", "region": "eu"}
+    assert base["properties"] == {"tier": "gold"}
+    assert merge_context(base, current_time=None) is base
+
+
+def test_coarse_clock_reuses_formatted_time(mocker):
+    monotonic = mocker.patch("UnleashClient.context.time.monotonic")
+    monotonic.return_value = 100.0
+    clock = CoarseClock(resolution_ms=500)
+
+    first = clock()
+    monotonic.return_value = 100.4
+    assert clock() is first
+
+    monotonic.return_value = 100.6
+    assert clock() is not first
+
+
+def test_unleash_context_matches_normalized_context():
+    raw_context = {"userId": "1234", "currentTime": "2024-01-01T00:00:00+00:00"}
+
+    context = UnleashContext(raw_context, STATIC_CONTEXT)
+
+    assert dict(context) == normalize_context(raw_context, STATIC_CONTEXT)
+
+
+def test_unleash_context_is_immutable():
+    context = UnleashContext({"userId": "1234"})
+
+    with pytest.raises(AttributeError):
+        context.userId = "5678"
+
+    with pytest.raises(TypeError):
+        context["userId"] = "5678"  # type: ignore
+
+    with pytest.raises(TypeError):
+        context["properties"]["tier"] = "silver"  # type: ignore
+
+
+def test_unleash_context_leaves_out_current_time():
+    context = UnleashContext({"userId": "1234"}, STATIC_CONTEXT)
+
+    assert "currentTime" not in context
+
+
+def test_unleash_context_as_dict_returns_copy():
+    context = UnleashContext({"userId": "1234", "tier": "gold"})
+
+    copied = context.as_dict()
+    copied["properties"]["tier"] = "silver"
+
+    assert context["properties"]["tier"] == "gold"
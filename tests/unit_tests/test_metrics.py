@@ -0,0 +1,214 @@
+import threading
+
+import pytest
+from yggdrasil_engine.engine import UnleashEngine
+
+from UnleashClient.metrics import (
+    MetricsCounter,
+    MetricsSampler,
+    MetricsSpool,
+    merge_buckets,
+)
+
+
+def test_metrics_counter_matches_engine_bucket():
+    engine = UnleashEngine()
+    counter = MetricsCounter()
+    for metrics in (engine, counter):
+        metrics.count_toggle("testFlag", True)
+        metrics.count_toggle("testFlag", False)
+        metrics.count_toggle("testFlag", True)
+        metrics.count_variant("testVariations", "VarA")
+        metrics.count_variant("testVariations", "VarA")
+
+    assert counter.drain()["toggles"] == engine.get_metrics()["toggles"]
+
+
+def test_metrics_counter_drain_resets_counts():
+    counter = MetricsCounter()
+    counter.count_toggle("testFlag", True)
+
+    bucket = counter.drain()
+
+    assert bucket["start"] <= bucket["stop"]
+    assert counter.drain() is None
+
+
+def test_metrics_counter_counts_across_threads():
+    counter = MetricsCounter(stripes=4)
+
+    def count():
+        for _ in range(1000):
+            counter.count_toggle("testFlag", True)
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.drain()["toggles"]["testFlag"]["yes"] == 8000
+
+
+def test_metrics_counter_spreads_threads_over_stripes():
+    counter = MetricsCounter(stripes=4)
+    used_stripes = []
+
+    def count():
+        counter.count_toggle("testFlag", True)
+        used_stripes.append(counter._stripe())
+
+    threads = [threading.Thread(target=count) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert {id(stripe) for stripe in used_stripes} == {
+        id(stripe) for stripe in counter._stripes
+    }
+    assert counter.drain()["toggles"]["testFlag"]["yes"] == 4
+
+
+def test_merge_buckets_adds_counts():
+    bucket = {
+        "start": "2024-01-01T00:00:00Z",
+        "stop": "2024-01-01T00:01:00Z",
+        "toggles": {"testFlag": {"yes": 1, "no": 2, "variants": {"VarA": 1}}},
+    }
+    other = {
+        "start": "2024-01-01T00:00:30Z",
+        "stop": "2024-01-01T00:01:00Z",
+        "toggles": {
+            "testFlag": {"yes": 1, "no": 0, "variants": {"VarA": 2, "VarB": 1}},
+            "testFlag2": {"yes": 0, "no": 1, "variants": {}},
+        },
+    }
+
+    merged = merge_buckets(bucket, other)
+
+    assert merged["start"] == "2024-01-01T00:00:00Z"
+    assert merged["toggles"] == {
+        "testFlag": {"yes": 2, "no": 2, "variants": {"VarA": 3, "VarB": 1}},
+        "testFlag2": {"yes": 0, "no": 1, "variants": {}},
+    }
+    assert merge_buckets(None, other) is other
+    assert merge_buckets(None, None) is None
+
+
+def test_metrics_sampler_counts_sample(mocker):
+    mocker.patch(
+        "UnleashClient.metrics.random.random", side_effect=[0.05, 0.5, 0.5, 0.99]
+    )
+    counter = MetricsCounter()
+    sampler = MetricsSampler(counter, rate=0.1, rates={"allFlag": 1.0})
+
+    sampler.count_toggle("hotFlag", True)
+    sampler.count_toggle("hotFlag", True)
+    sampler.count_variant("hotFlag", "VarA")
+    sampler.count_toggle("allFlag", False)
+
+    toggles = counter.drain()["toggles"]
+    assert toggles["hotFlag"] == {"yes": 1, "no": 0, "variants": {}}
+    assert toggles["allFlag"]["no"] == 1
+    assert sampler.sample_rate("hotFlag") == 0.1
+    assert sampler.sample_rate("allFlag") == 1.0
+
+
+def test_metrics_sampler_scales_counts():
+    engine = UnleashEngine()
+    sampler = MetricsSampler(engine, rates={"hotFlag": 0.25})
+    engine.count_toggle("hotFlag", True)
+    engine.count_toggle("hotFlag", False)
+    engine.count_variant("hotFlag", "VarA")
+    engine.count_toggle("otherFlag", True)
+
+    toggles = sampler.scale(engine.get_metrics())["toggles"]
+
+    assert toggles["hotFlag"] == {"yes": 4, "no": 4, "variants": {"VarA": 4}}
+    assert toggles["otherFlag"]["yes"] == 1
+
+
+def test_metrics_sampler_estimates_totals():
+    counter = MetricsCounter()
+    sampler = MetricsSampler(counter, rate=0.1)
+    for i in range(100000):
+        sampler.count_toggle("hotFlag", i % 4 == 0)
+
+    toggle = sampler.scale(counter.drain())["toggles"]["hotFlag"]
+
+    assert abs(toggle["yes"] - 25000) < 2500
+    assert abs(toggle["no"] - 75000) < 2500
+
+
+def test_metrics_sampler_rejects_invalid_rates():
+    with pytest.raises(ValueError):
+        MetricsSampler(MetricsCounter(), rate=0)
+    with pytest.raises(ValueError):
+        MetricsSampler(MetricsCounter(), rates={"hotFlag": 2})
+
+
+def _bucket(**toggles):
+    return {
+        "start": "2024-01-01T00:00:00+00:00",
+        "stop": "2024-01-01T00:01:00+00:00",
+        "toggles": {
+            name: {"yes": yes, "no": 0, "variants": {}} for name, yes in toggles.items()
+        },
+    }
+
+
+def test_metrics_spool_merges_buckets():
+    spool = MetricsSpool()
+    spool.add(_bucket(testFlag=1))
+    spool.add(_bucket(testFlag=2, otherFlag=1))
+
+    bucket, _ = spool.take()
+
+    assert bucket["toggles"]["testFlag"]["yes"] == 3
+    assert bucket["toggles"]["otherFlag"]["yes"] == 1
+    assert spool.take() == (None, None)
+
+
+def test_metrics_spool_caps_toggles():
+    spool = MetricsSpool(max_toggles=2)
+    spool.add(_bucket(a=1, b=1))
+    spool.add(_bucket(c=1))
+
+    assert set(spool.take()[0]["toggles"]) == {"a", "b"}
+
+
+def test_metrics_spool_drops_old_buckets(mocker):
+    now = mocker.patch("UnleashClient.metrics.time.time", return_value=1000)
+    spool = MetricsSpool(max_age=60)
+    spool.add(_bucket(testFlag=1))
+
+    now.return_value = 1061
+
+    assert spool.take() == (None, None)
+
+
+@pytest.mark.parametrize("in_directory", [False, True])
+def test_metrics_spool_keeps_age_when_spooled_again(mocker, tmpdir, in_directory):
+    now = mocker.patch("UnleashClient.metrics.time.time", return_value=0)
+    spool = MetricsSpool(directory=str(tmpdir) if in_directory else None, max_age=10)
+    spool.add(_bucket(testFlag=1))
+
+    # Sending keeps failing, so the spooled bucket is taken and spooled again.
+    now.return_value = 8
+    bucket, spooled_at = spool.take()
+    assert spooled_at == 0
+    spool.add(merge_buckets(bucket, _bucket(testFlag=1)), spooled_at)
+
+    now.return_value = 16
+    assert spool.take() == (None, None)
+
+
+def test_metrics_spool_directory_survives_restart(tmpdir):
+    MetricsSpool(directory=str(tmpdir)).add(_bucket(testFlag=1))
+    MetricsSpool(directory=str(tmpdir)).add(_bucket(testFlag=2))
+
+    restarted = MetricsSpool(directory=str(tmpdir))
+
+    assert restarted.take()[0]["toggles"]["testFlag"]["yes"] == 3
+    assert restarted.take() == (None, None)
+    assert tmpdir.listdir() == []
@@ -0,0 +1,100 @@
+import os
+import time
+
+import pytest
+
+from UnleashClient.metrics_aggregator import MetricsAggregator
+
+
+def _bucket(yes):
+    return {
+        "start": "2024-01-01T00:00:00+00:00",
+        "stop": "2024-01-01T00:01:00+00:00",
+        "toggles": {"testFlag": {"yes": yes, "no": 0, "variants": {}}},
+    }
+
+
+def _wait_for_metrics(aggregator):
+    deadline = time.monotonic() + 2
+    while aggregator._received is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture()
+def socket_path(tmpdir):
+    return os.path.join(str(tmpdir), "metrics.sock")
+
+
+def test_aggregator_leader_sends_for_all_processes(socket_path):
+    leader = MetricsAggregator(socket_path)
+    follower = MetricsAggregator(socket_path)
+    try:
+        assert leader.submit(_bucket(1)) == _bucket(1)
+        assert leader.is_leader
+
+        assert follower.submit(_bucket(2)) is None
+        assert not follower.is_leader
+        _wait_for_metrics(leader)
+
+        bucket = leader.submit(_bucket(4))
+        assert bucket["toggles"]["testFlag"]["yes"] == 6
+        assert bucket["stop"] == _bucket(4)["stop"]
+    finally:
+        follower.close()
+        leader.close()
+
+
+def test_aggregator_follower_takes_over(socket_path):
+    leader = MetricsAggregator(socket_path)
+    follower = MetricsAggregator(socket_path)
+    leader.submit(None)
+    assert leader.is_leader
+
+    leader.close()
+
+    assert follower.submit(_bucket(1)) == _bucket(1)
+    assert follower.is_leader
+    follower.close()
+    assert not os.path.exists(socket_path)
+
+
+def test_aggregator_replaces_stale_socket(socket_path):
+    with open(socket_path, "w"):
+        pass
+    aggregator = MetricsAggregator(socket_path)
+
+    assert aggregator.submit(_bucket(1)) == _bucket(1)
+    assert aggregator.is_leader
+    aggregator.close()
+
+
+def test_aggregator_socket_is_private(socket_path):
+    aggregator = MetricsAggregator(socket_path)
+    aggregator.submit(None)
+
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+    aggregator.close()
+
+
+@pytest.mark.parametrize(
+    "bucket",
+    [
+        [1],
+        {"start": "2024-01-01T00:00:00+00:00"},
+        {"toggles": []},
+        {"toggles": {"testFlag": {"yes": "1", "no": 0, "variants": {}}}},
+        {"toggles": {"testFlag": {"yes": 1, "no": 0, "variants": {"a": None}}}},
+    ],
+)
+def test_aggregator_drops_malformed_buckets(socket_path, bucket):
+    leader = MetricsAggregator(socket_path)
+    follower = MetricsAggregator(socket_path)
+    try:
+        leader.submit(None)
+        assert follower._push(bucket)
+        assert follower._push(_bucket(2))
+        _wait_for_metrics(leader)
+
+        assert leader.submit(_bucket(1))["toggles"]["testFlag"]["yes"] == 3
+    finally:
+        leader.close()
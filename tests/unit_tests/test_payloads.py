@@ -0,0 +1,36 @@
+import pytest
+
+from UnleashClient.payloads import PayloadCache, freeze
+
+
+def test_freeze_makes_json_immutable():
+    frozen = freeze({"limits": [1, 2, {"nested": True}]})
+
+    assert frozen["limits"] == (1, 2, {"nested": True})
+    with pytest.raises(TypeError):
+        frozen["limits"] = ()
+    with pytest.raises(TypeError):
+        frozen["limits"][2]["nested"] = False
+
+
+def test_payload_cache_decodes_once():
+    payload_cache = PayloadCache()
+
+    first = payload_cache.decode("testFlag", "VarA", "json", '{"a": 1}')
+    second = payload_cache.decode("testFlag", "VarA", "json", '{"a": 1}')
+
+    assert first is second
+    assert first == {"a": 1}
+    assert len(payload_cache) == 1
+
+    payload_cache.clear()
+    assert len(payload_cache) == 0
+
+
+def test_payload_cache_decodes_numbers():
+    payload_cache = PayloadCache()
+
+    assert payload_cache.decode("testFlag", "VarA", "number", "42") == 42
+    assert payload_cache.decode("testFlag", "VarB", "number", "4.2") == 4.2
+    with pytest.raises(ValueError):
+        payload_cache.decode("testFlag", "VarC", "number", "many")
@@ -0,0 +1,60 @@
+from UnleashClient.result_cache import ResultCache, context_fingerprint
+
+
+def test_result_cache_counts_hits_and_misses():
+    cache = ResultCache(max_size=10)
+
+    assert cache.get_or_compute("key", lambda: True)
+    assert cache.get_or_compute("key", lambda: False)
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "max_size": 10}
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_size=2)
+
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("c", lambda: 3)
+
+    assert cache.get_or_compute("a", lambda: "recomputed") == 1
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+
+def test_result_cache_expires_entries(mocker):
+    monotonic = mocker.patch("UnleashClient.result_cache.time.monotonic")
+    monotonic.return_value = 100.0
+    cache = ResultCache(max_size=10, ttl=5)
+
+    cache.get_or_compute("key", lambda: 1)
+    monotonic.return_value = 106.0
+
+    assert cache.get_or_compute("key", lambda: 2) == 2
+
+
+def test_result_cache_drops_results_from_old_generation():
+    cache = ResultCache(max_size=10)
+
+    def compute_during_state_change():
+        cache.clear(generation=1)
+        return "stale"
+
+    cache.get_or_compute("key", compute_during_state_change)
+
+    assert len(cache) == 0
+    assert cache.get_or_compute("key", lambda: "fresh") == "fresh"
+
+
+def test_context_fingerprint_ignores_current_time():
+    context = {
+        "userId": "1",
+        "currentTime": "2024-01-01T00:00:00+00:00",
+        "properties": {"tier": "gold"},
+    }
+    later_context = {**context, "currentTime": "2024-01-02T00:00:00+00:00"}
+
+    assert context_fingerprint(context) == context_fingerprint(later_context)
+    assert context_fingerprint(context) != context_fingerprint(
+        {**context, "properties": {"tier": "silver"}}
+    )
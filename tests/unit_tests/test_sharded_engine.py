@@ -0,0 +1,46 @@
+import json
+import threading
+
+from tests.utilities.mocks.mock_features import MOCK_FEATURE_RESPONSE
+from UnleashClient.sharded_engine import ShardedEngine
+
+
+def test_sharded_engine_loads_state_into_every_shard():
+    engine = ShardedEngine(3)
+
+    engine.take_state(json.dumps(MOCK_FEATURE_RESPONSE))
+
+    for shard in engine.shards:
+        assert shard.is_enabled("testFlag", {})
+
+
+def test_sharded_engine_assigns_threads_round_robin():
+    engine = ShardedEngine(2)
+    engine.take_state(json.dumps(MOCK_FEATURE_RESPONSE))
+    used_shards = []
+
+    def evaluate():
+        engine.count_toggle("testFlag", bool(engine.is_enabled("testFlag", {})))
+        used_shards.append(engine._shard())
+
+    threads = [threading.Thread(target=evaluate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert {id(shard) for shard in used_shards} == {id(s) for s in engine.shards}
+    for shard in engine.shards:
+        assert shard.get_metrics()["toggles"]["testFlag"]["yes"] == 2
+
+
+def test_sharded_engine_merges_metrics():
+    engine = ShardedEngine(2)
+    engine.shards[0].count_toggle("testFlag", True)
+    engine.shards[1].count_toggle("testFlag", False)
+    engine.shards[1].count_variant("testVariations", "VarA")
+
+    toggles = engine.get_metrics()["toggles"]
+
+    assert toggles["testFlag"] == {"yes": 1, "no": 1, "variants": {}}
+    assert toggles["testVariations"]["variants"] == {"VarA": 1}
+    assert engine.get_metrics() is None
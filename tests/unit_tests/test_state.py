@@ -0,0 +1,109 @@
+import json
+
+from tests.utilities.mocks.mock_features import (
+    MOCK_FEATURE_RESPONSE,
+    MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE,
+    MOCK_FEATURES_WITH_SEGMENTS_RESPONSE,
+)
+from UnleashClient.state import FeatureState
+
+
+class PureStrategy:
+    pure = True
+    context_fields = ["environment", "tier"]
+
+
+def build_state(provisioning, custom_strategies=None):
+    return FeatureState.from_json(json.dumps(provisioning), 1, custom_strategies)
+
+
+def test_random_and_time_dependent_features_are_volatile():
+    state = build_state(MOCK_FEATURE_RESPONSE)
+
+    # gradualRolloutRandom
+    assert "testFlag2" in state.volatile_features
+    # currentTime constraint
+    assert "testConstraintFlag" in state.volatile_features
+    # Custom strategy
+    assert "testContextFlag" in state.volatile_features
+    assert "testFlag" not in state.volatile_features
+
+
+def test_pure_custom_strategies_are_not_volatile():
+    state = build_state(
+        MOCK_FEATURE_RESPONSE, custom_strategies={"custom-context": PureStrategy()}
+    )
+
+    assert "testContextFlag" not in state.volatile_features
+
+
+def test_segment_constraints_are_checked_for_current_time():
+    state = build_state(MOCK_FEATURES_WITH_SEGMENTS_RESPONSE)
+
+    assert "Test" in state.volatile_features
+
+
+def test_context_independent_features_are_constant():
+    state = build_state(MOCK_FEATURE_RESPONSE)
+
+    assert state.constant_features["testFlag"] is True
+    assert "testConstraintFlag" not in state.constant_features
+    assert "testVariations" not in state.constant_features
+
+
+def test_disabled_features_are_constant():
+    state = build_state(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE)
+
+    assert state.constant_features["Disabled"] is False
+    assert "Child" not in state.constant_features
+
+
+def test_impression_data_features_are_collected():
+    state = build_state(MOCK_FEATURE_RESPONSE)
+
+    assert state.impression_data_features == frozenset(["testFlag", "testVariations"])
+    assert "testFlag2" not in state.impression_data_features
+
+
+def test_current_time_usage_is_detected():
+    assert build_state(MOCK_FEATURE_RESPONSE).uses_current_time
+    assert build_state(MOCK_FEATURES_WITH_SEGMENTS_RESPONSE).uses_current_time
+    assert not build_state(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE).uses_current_time
+
+
+def test_context_fields_are_collected():
+    state = build_state(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE)
+
+    assert state.context_fields == {"userId", "sessionId", "remoteAddress"}
+
+
+def test_context_fields_include_constraints_and_declared_strategy_fields():
+    state = build_state(
+        MOCK_FEATURE_RESPONSE, custom_strategies={"custom-context": PureStrategy()}
+    )
+
+    assert {"currentTime", "userId", "environment", "tier"} <= state.context_fields
+
+
+def test_context_fields_are_unknown_for_undeclared_custom_strategies():
+    state = build_state(MOCK_FEATURE_RESPONSE)
+
+    assert state.context_fields is None
+
+
+def test_default_stickiness_requires_an_identifier():
+    state = build_state(MOCK_FEATURE_RESPONSE)
+    context = {"appName": "pytest", "properties": {}}
+
+    assert not state.is_cacheable("testVariations", context)
+    assert state.is_cacheable("testVariations", {**context, "userId": "1"})
+    assert state.is_cacheable("testFlag", context)
+
+
+def test_dependencies_inherit_parent_requirements():
+    provisioning = json.loads(json.dumps(MOCK_FEATURE_WITH_DEPENDENCIES_RESPONSE))
+    provisioning["features"][0]["strategies"][0]["name"] = "gradualRolloutRandom"
+    state = build_state(provisioning)
+
+    assert "Parent" in state.volatile_features
+    assert "Child" in state.volatile_features
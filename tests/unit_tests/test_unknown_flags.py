@@ -0,0 +1,66 @@
+import threading
+
+from UnleashClient.unknown_flags import UnknownFlagCounter
+
+
+def test_unknown_flag_counter_logs_first_lookup():
+    counter = UnknownFlagCounter(interval=60)
+
+    assert counter.record("missing") == 0
+    assert counter.record("missing") is None
+    assert counter.record("other") == 0
+    assert counter.counts() == {"missing": 2, "other": 1}
+
+
+def test_unknown_flag_counter_reports_suppressed_lookups(mocker):
+    now = mocker.patch("UnleashClient.unknown_flags.time.monotonic", return_value=0)
+    counter = UnknownFlagCounter(interval=60)
+
+    assert counter.record("missing") == 0
+    for _ in range(3):
+        assert counter.record("missing") is None
+
+    now.return_value = 61
+    assert counter.record("missing") == 3
+    assert counter.record("missing") is None
+    assert counter.counts() == {"missing": 6}
+
+
+def test_unknown_flag_counter_unlogged_lookups_dont_suppress_logging(mocker):
+    now = mocker.patch("UnleashClient.unknown_flags.time.monotonic", return_value=0)
+    counter = UnknownFlagCounter(interval=60)
+
+    assert counter.record("missing", log=False) is None
+    assert counter.record("missing") == 0
+    assert counter.record("missing", log=False) is None
+    assert counter.record("missing") is None
+
+    now.return_value = 61
+    assert counter.record("missing") == 1
+    assert counter.counts() == {"missing": 5}
+
+
+def test_unknown_flag_counter_reset():
+    counter = UnknownFlagCounter()
+    counter.record("missing")
+
+    counter.reset()
+
+    assert counter.counts() == {}
+    assert counter.record("missing") == 0
+
+
+def test_unknown_flag_counter_counts_across_threads():
+    counter = UnknownFlagCounter()
+
+    def record():
+        for _ in range(1000):
+            counter.record("missing")
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.counts() == {"missing": 8000}
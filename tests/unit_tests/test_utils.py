@@ -0,0 +1,20 @@
+import threading
+
+from UnleashClient.utils import InstanceCounter
+
+
+def test_instance_counter_counts_across_threads():
+    counter = InstanceCounter()
+
+    def increment():
+        for _ in range(1000):
+            counter.increment("client")
+
+    threads = [threading.Thread(target=increment) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.count("client") == 8000
+    assert "client" in counter
@@ -379,3 +379,42 @@ MOCK_FEATURE_WITH_CUSTOM_CONTEXT_REQUIREMENTS = {
         },
     ],
 }
+
+MOCK_FEATURE_WITH_PAYLOADS = {
+    "version": 1,
+    "features": [
+        {
+            "name": "jsonPayload",
+            "description": "Feature toggle with a JSON payload",
+            "enabled": True,
+            "strategies": [{"name": "default", "parameters": {}}],
+            "variants": [
+                {
+                    "name": "config",
+                    "weight": 1000,
+                    "payload": {
+                        "type": "json",
+                        "value": '{"limits": [1, 2], "mode": "fast"}',
+                    },
+                }
+            ],
+            "createdAt": "2018-10-09T06:04:05.667Z",
+            "impressionData": False,
+        },
+        {
+            "name": "numberPayload",
+            "description": "Feature toggle with a number payload",
+            "enabled": True,
+            "strategies": [{"name": "default", "parameters": {}}],
+            "variants": [
+                {
+                    "name": "limit",
+                    "weight": 1000,
+                    "payload": {"type": "number", "value": "42"},
+                }
+            ],
+            "createdAt": "2018-10-09T06:04:05.667Z",
+            "impressionData": False,
+        },
+    ],
+}